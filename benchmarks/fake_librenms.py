@@ -0,0 +1,652 @@
+"""
+Stand-in for the LibreNMS API serving a synthetic fleet, for benchmarking the handler without a real instance.
+
+Every device, port, FDB entry, log and inventory item is derived from the seed, so two servers started with the same
+arguments serve the same data. Responses are encoded once and cached, so the server costs as little as possible
+next to the client being measured. Latency and errors can be injected into every request.
+
+Run it on its own with `python benchmarks/fake_librenms.py --devices 1000 --port 8000`.
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import re
+import socket
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from ipaddress import IPv4Network, ip_address, ip_network
+from random import Random
+from threading import Thread
+from time import sleep
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+OSES = (("ios", "C9300-48P", "17.6.4"), ("junos", "EX4300-48T", "21.4R3"), ("linux", "Generic x86", "5.15.0"))
+LOCATIONS = ("London", "Manchester", "Leeds", "Glasgow", "Cardiff")
+# Stands in for a rendered graph, about the size of a small RRD graph PNG
+GRAPH = b"\x89PNG\r\n\x1a\n" + bytes(16384)
+
+
+def hostname(index: int):
+    """Return the hostname of the device at a zero-based index of the fleet."""
+    return f"dev{index:05d}.example.net"
+
+
+def _datetime(seconds: int):
+    """Format seconds after the start of 2023 the way LibreNMS formats dates, with 28 day months."""
+    days, seconds = divmod(seconds, 86400)
+    hours, seconds = divmod(seconds, 3600)
+    return f"2023-{days // 28 % 12 + 1:02d}-{days % 28 + 1:02d} {hours:02d}:{seconds // 60:02d}:{seconds % 60:02d}"
+
+
+class Fleet:  # pylint: disable=R0902
+    """
+    Synthetic set of devices and everything LibreNMS knows about them.
+
+    :param devices: Number of devices
+    :param ports: Number of ports per device
+    :param fdb: Number of FDB entries per port
+    :param logs: Number of entries per device in each log
+    :param inventory: Number of modules per device, each holding four port transceivers under one chassis
+    :param seed: Seed every value is derived from
+    """
+
+    def __init__(  # pylint: disable=R0913
+        self, devices: int = 200, ports: int = 24, fdb: int = 2, logs: int = 500, inventory: int = 4, seed: int = 0
+    ):
+        self.devices = devices
+        self.ports = ports
+        self.fdb = fdb
+        self.logs = logs
+        self.inventory = inventory
+        self.seed = seed
+        self.ids = {hostname(index): index + 1 for index in range(devices)}
+
+    def device_id(self, device: str):
+        """Return the ID of a device given as a hostname or an ID, None if it is not part of the fleet."""
+        device_id = int(device) if device.isdigit() else self.ids.get(device)
+        return device_id if device_id and device_id <= self.devices else None
+
+    def device(self, device_id: int):
+        """Return the device with the given ID."""
+        rng = Random(self.seed * 1_000_003 + device_id)
+        os_name, hardware, version = OSES[device_id % len(OSES)]
+        return {
+            "device_id": device_id,
+            "hostname": hostname(device_id - 1),
+            "sysName": hostname(device_id - 1).split(".", 1)[0],
+            "ip": str(ip_address("10.0.0.0") + device_id),
+            "os": os_name,
+            "hardware": hardware,
+            "version": version,
+            "serial": f"SN{rng.randrange(16**8):08X}",
+            "status": rng.random() > 0.02,
+            "disabled": 0,
+            "ignore": 0,
+            "location": LOCATIONS[device_id % len(LOCATIONS)],
+            "type": "network",
+            "uptime": rng.randrange(86400, 86400 * 400),
+            "last_polled": _datetime(device_id % 300),
+        }
+
+    def ports_of(self, device_id: int):
+        """Return the ports of a device."""
+        rng = Random(self.seed * 1_000_033 + device_id)
+        return [
+            {
+                "port_id": (device_id - 1) * self.ports + index + 1,
+                "device_id": device_id,
+                "ifIndex": index + 1,
+                "ifName": f"Gi1/0/{index + 1}",
+                "ifAlias": f"uplink-{index}" if index < 2 else f"access port {index}",
+                "ifDescr": f"GigabitEthernet1/0/{index + 1}",
+                "ifType": "ethernetCsmacd",
+                "ifSpeed": 1_000_000_000,
+                "ifAdminStatus": "up",
+                "ifOperStatus": "up" if rng.random() > 0.3 else "down",
+                "ifInOctets_rate": rng.randrange(10**7),
+                "ifOutOctets_rate": rng.randrange(10**7),
+                "ifInErrors": rng.randrange(5),
+                "ifOutErrors": rng.randrange(5),
+            }
+            for index in range(self.ports)
+        ]
+
+    def fdb_of(self, device_id: int):
+        """Return the FDB entries learnt on the ports of a device."""
+        entries = []
+        for port in self.ports_of(device_id):
+            for index in range(self.fdb):
+                number = port["port_id"] * self.fdb + index
+                entries.append(
+                    {
+                        "ports_fdb_id": number,
+                        "port_id": port["port_id"],
+                        "device_id": device_id,
+                        "mac_address": f"02{number:010x}",
+                        "vlan_id": 100 + port["ifIndex"] % 4,
+                        "created_at": _datetime(0),
+                        "updated_at": _datetime(number % 86400),
+                    }
+                )
+        return entries
+
+    def arp_of(self, device_id: int):
+        """Return the ARP entries of a device, one per FDB entry."""
+        return [
+            {
+                "port_id": entry["port_id"],
+                "mac_address": entry["mac_address"],
+                "ipv4_address": str(ip_address("172.16.0.0") + entry["ports_fdb_id"] % 2**20),
+                "context_name": "",
+            }
+            for entry in self.fdb_of(device_id)
+        ]
+
+    def log_of(self, log: str, device_id: int):
+        """Return the entries of one log for a device, oldest first."""
+        rng = Random(f"{self.seed}-{log}-{device_id}")
+        entries = []
+        for index in range(self.logs):
+            when = _datetime(index * 60 + device_id)
+            number = (device_id - 1) * self.logs + index + 1
+            if log == "syslog":
+                entry = {"seq": number, "timestamp": when, "program": "kernel", "priority": "info"}
+            elif log == "alertlog":
+                entry = {"id": number, "time_logged": when, "rule_id": rng.randrange(1, 20), "state": rng.randrange(2)}
+            else:
+                entry = {"event_id" if log == "eventlog" else "id": number, "datetime": when, "type": "interface"}
+            entry.update({"device_id": device_id, "hostname": hostname(device_id - 1), "message": f"event {number}"})
+            entries.append(entry)
+        return entries
+
+    def inventory_of(self, device_id: int):
+        """Return the inventory tree of a device as a flat list, a chassis holding modules holding transceivers."""
+        items = [(1, 0, "chassis", "Chassis")]
+        for module in range(self.inventory):
+            module_index = 1000 * (module + 1)
+            items.append((module_index, 1, "module", f"Module {module}"))
+            items += [
+                (module_index + port + 1, module_index, "port", f"Transceiver {module}/{port}") for port in range(4)
+            ]
+        return [
+            {
+                "entPhysical_id": device_id * 100_000 + index,
+                "device_id": device_id,
+                "entPhysicalIndex": index,
+                "entPhysicalContainedIn": parent,
+                "entPhysicalParentRelPos": -1,
+                "entPhysicalClass": physical_class,
+                "entPhysicalName": name,
+                "entPhysicalDescr": name,
+                "entPhysicalModelName": f"{physical_class.upper()}-1",
+                "entPhysicalSerialNum": f"{device_id:05d}{index:06d}",
+                "entPhysicalMfgName": "Example",
+            }
+            for index, parent, physical_class, name in items
+        ]
+
+    def links(self):
+        """Return the LLDP links of the fleet, a chain of every device to the next one."""
+        return [
+            {
+                "id": device_id,
+                "local_device_id": device_id,
+                "local_port_id": (device_id - 1) * self.ports + 1,
+                "remote_device_id": device_id + 1,
+                "remote_hostname": hostname(device_id),
+                "remote_port": "Gi1/0/2",
+                "protocol": "lldp",
+                "active": 1,
+            }
+            for device_id in range(1, self.devices)
+        ]
+
+    def sensors(self):
+        """Return two temperature sensors per device."""
+        return [sensor for device_id in range(1, self.devices + 1) for sensor in self.sensors_of(device_id)]
+
+    @staticmethod
+    def sensors_of(device_id: int):
+        """Return the health sensors of a device, two temperature sensors."""
+        return [
+            {
+                "sensor_id": device_id * 2 + index,
+                "device_id": device_id,
+                "sensor_class": "temperature",
+                "sensor_descr": f"Temperature {index}",
+                "sensor_current": 30 + (device_id + index) % 20,
+            }
+            for index in range(2)
+        ]
+
+    @staticmethod
+    def wireless_sensors_of(device_id: int):
+        """Return the wireless sensors of a device, one RSSI sensor on every third device."""
+        if device_id % 3:
+            return []
+        return [
+            {
+                "sensor_id": device_id,
+                "device_id": device_id,
+                "sensor_class": "rssi",
+                "sensor_descr": "Radio 1 RSSI",
+                "sensor_current": -40 - device_id % 30,
+            }
+        ]
+
+
+def _page(entries, query: dict):
+    """Filter log entries on from/to and apply start/limit, the way the log endpoints do."""
+    if "from" in query:
+        entries = [entry for entry in entries if _when(entry) >= query["from"]]
+    if "to" in query:
+        entries = [entry for entry in entries if _when(entry) <= query["to"]]
+    start = int(query.get("start") or 0)
+    limit = int(query.get("limit") or 50)
+    return entries[start : start + limit]
+
+
+def _when(entry: dict):
+    return entry.get("datetime") or entry.get("timestamp") or entry.get("time_logged")
+
+
+class Api:
+    """Routes a request path and query to the fleet, returning the status code and body, JSON or a PNG for graphs."""
+
+    def __init__(self, fleet: Fleet):
+        self.fleet = fleet
+        self.routes = [
+            (re.compile(pattern), getattr(self, name))
+            for pattern, name in (
+                (r"/api/v0/system", "system"),
+                (r"/api/v0/devices", "devices"),
+                (r"/api/v0/devices/([^/]+)", "device"),
+                (r"/api/v0/devices/([^/]+)/ports", "ports"),
+                (r"/api/v0/devices/([^/]+)/ports/([^/]+)", "port"),
+                (r"/api/v0/devices/([^/]+)/fdb", "device_fdb"),
+                (r"/api/v0/devices/([^/]+)/links", "device_links"),
+                (r"/api/v0/devices/([^/]+)/(health|wireless)(?:/([^/]+))?(?:/([^/]+))?", "device_sensors"),
+                (r"/api/v0/devices/([^/]+)/graphs/health/([^/]+)(?:/([^/]+))?", "health_graph"),
+                (r"/api/v0/devices/([^/]+)/(device_[a-z_]+)", "device_graph"),
+                (r"/api/v0/resources/fdb", "fdb"),
+                (r"/api/v0/resources/fdb/([^/]+)", "fdb_mac"),
+                (r"/api/v0/resources/fdb/([^/]*)/detail", "fdb_detail"),
+                (r"/api/v0/resources/links", "links"),
+                (r"/api/v0/resources/sensors", "sensors"),
+                (r"/api/v0/resources/locations", "locations"),
+                (r"/api/v0/resources/vlans", "vlans"),
+                (r"/api/v0/resources/ip/arp/(.+)", "arp"),
+                (r"/api/v0/logs/(eventlog|syslog|alertlog|authlog)(?:/([^/]+))?", "log"),
+                (r"/api/v0/inventory/([^/]+)", "inventory"),
+                (r"/api/v0/inventory/([^/]+)/all", "inventory_all"),
+                (r"/api/v0/devicegroups", "devicegroups"),
+                (r"/api/v0/devicegroups/([^/]+)", "devicegroup"),
+            )
+        ]
+
+    def __call__(self, path: str, query: dict):
+        for pattern, route in self.routes:
+            match = pattern.fullmatch(path)
+            if match:
+                return route(query, *(unquote(group) if group else group for group in match.groups()))
+        return 404, {"status": "error", "message": f"No route for {path}"}
+
+    def _device(self, device: str, query: dict, build):
+        device_id = self.fleet.device_id(device)
+        if device_id is None:
+            return 404, {"status": "error", "message": f"Device {device} does not exist"}
+        return build(device_id, query)
+
+    @staticmethod
+    def _ok(key: str, items):
+        return 200, {"status": "ok", key: items, "count": len(items)}
+
+    def system(self, _query):
+        return 200, {"status": "ok", "system": [{"local_ver": "24.1.0", "db_schema": "2024_01_01"}], "count": 1}
+
+    def devices(self, _query):
+        return self._ok("devices", [self.fleet.device(device_id) for device_id in range(1, self.fleet.devices + 1)])
+
+    def device(self, query, device):
+        return self._device(device, query, lambda device_id, _: self._ok("devices", [self.fleet.device(device_id)]))
+
+    def ports(self, query, device):
+        return self._device(device, query, lambda device_id, _: self._ok("ports", self.fleet.ports_of(device_id)))
+
+    def port(self, query, device, interface_name):
+        def build(device_id, _):
+            ports = [port for port in self.fleet.ports_of(device_id) if port["ifName"] == interface_name]
+            return (200, {"status": "ok", "port": ports[0]}) if ports else (404, {"status": "error"})
+
+        return self._device(device, query, build)
+
+    def device_sensors(self, query, device, kind, graph_type, sensor_id):  # pylint: disable=R0913
+        def build(device_id, _):
+            if kind == "health":
+                prefix, sensors = "device_", self.fleet.sensors_of(device_id)
+            else:
+                prefix, sensors = "device_wireless_", self.fleet.wireless_sensors_of(device_id)
+            if graph_type is None:
+                classes = sorted({sensor["sensor_class"] for sensor in sensors})
+                return self._ok("graphs", [{"desc": name.capitalize(), "name": prefix + name} for name in classes])
+            sensors = [sensor for sensor in sensors if prefix + sensor["sensor_class"] == graph_type]
+            if sensor_id is None:
+                return self._ok(
+                    "graphs", [{"sensor_id": sensor["sensor_id"], "desc": sensor["sensor_descr"]} for sensor in sensors]
+                )
+            return self._ok("graphs", [sensor for sensor in sensors if str(sensor["sensor_id"]) == sensor_id])
+
+        return self._device(device, query, build)
+
+    def health_graph(self, query, device, _health_type, _sensor_id):
+        return self._device(device, query, lambda device_id, _: (200, GRAPH))
+
+    def device_graph(self, query, device, _graph_type):
+        def build(_device_id, query):
+            if query.get("output") != "base64":
+                return 200, GRAPH
+            return 200, {"status": "ok", "image": "data:image/png;base64," + base64.b64encode(GRAPH).decode()}
+
+        return self._device(device, query, build)
+
+    def device_fdb(self, query, device):
+        return self._device(device, query, lambda device_id, _: self._ok("ports_fdb", self.fleet.fdb_of(device_id)))
+
+    def device_links(self, query, device):
+        return self._device(
+            device,
+            query,
+            lambda device_id, _: self._ok(
+                "links", [link for link in self.fleet.links() if link["local_device_id"] == device_id]
+            ),
+        )
+
+    def _fdb_entries(self, mac: str):
+        """Return every FDB entry, or the ones of one MAC address when given."""
+        if not mac:
+            return [entry for device_id in range(1, self.fleet.devices + 1) for entry in self.fleet.fdb_of(device_id)]
+        number = int(mac.replace(":", "").replace("-", "").lower()[2:], 16)
+        device_id = (number // self.fleet.fdb - 1) // self.fleet.ports + 1
+        if not 1 <= device_id <= self.fleet.devices:
+            return []
+        return [entry for entry in self.fleet.fdb_of(device_id) if entry["ports_fdb_id"] == number]
+
+    def fdb(self, _query):
+        return self._ok("ports_fdb", self._fdb_entries(None))
+
+    def fdb_mac(self, _query, mac):
+        entries = self._fdb_entries(mac)
+        return self._ok("ports_fdb", entries) if entries else (404, {"status": "error", "message": "Mac not found"})
+
+    def fdb_detail(self, _query, mac):
+        entries = self._fdb_entries(mac)
+        if not entries:
+            return 404, {"status": "error", "message": "Mac not found"}
+        ports = {}
+        for entry in entries:
+            if entry["device_id"] not in ports:
+                ports[entry["device_id"]] = {port["port_id"]: port for port in self.fleet.ports_of(entry["device_id"])}
+        detail = []
+        for entry in entries:
+            port = ports[entry["device_id"]][entry["port_id"]]
+            detail.append(
+                {
+                    "hostname": hostname(entry["device_id"] - 1),
+                    "sysName": hostname(entry["device_id"] - 1).split(".", 1)[0],
+                    "ifName": port["ifName"],
+                    "ifAlias": port["ifAlias"],
+                    "ifDescr": port["ifDescr"],
+                    "last_seen": "2 minutes ago",
+                    **entry,
+                }
+            )
+        return self._ok("ports_fdb", detail)
+
+    def links(self, _query):
+        return self._ok("links", self.fleet.links())
+
+    def sensors(self, _query):
+        return self._ok("sensors", self.fleet.sensors())
+
+    def locations(self, _query):
+        return self._ok("locations", [{"id": index, "location": name} for index, name in enumerate(LOCATIONS, 1)])
+
+    def vlans(self, _query):
+        return self._ok(
+            "vlans", [{"vlan_id": vlan, "vlan_vlan": vlan, "vlan_name": f"vlan{vlan}"} for vlan in range(100, 104)]
+        )
+
+    def arp(self, query, address):
+        devices = range(1, self.fleet.devices + 1)
+        if query.get("device"):
+            devices = [self.fleet.device_id(query["device"])] if self.fleet.device_id(query["device"]) else []
+        network = ip_network(address, strict=False) if "/" in address else IPv4Network(f"{address}/32")
+        entries = [
+            entry
+            for device_id in devices
+            for entry in self.fleet.arp_of(device_id)
+            if ip_address(entry["ipv4_address"]) in network
+        ]
+        return self._ok("arp", entries)
+
+    def log(self, query, log, device):
+        if device is None:
+            return self._ok(
+                "logs",
+                _page(
+                    [
+                        entry
+                        for device_id in range(1, self.fleet.devices + 1)
+                        for entry in self.fleet.log_of(log, device_id)
+                    ],
+                    query,
+                ),
+            )
+        return self._device(
+            device, query, lambda device_id, _: self._ok("logs", _page(self.fleet.log_of(log, device_id), query))
+        )
+
+    def inventory(self, query, device):
+        def build(device_id, _):
+            items = self.fleet.inventory_of(device_id)
+            contained_in = int(query.get("entPhysicalContainedIn") or 0)
+            items = [item for item in items if item["entPhysicalContainedIn"] == contained_in]
+            if query.get("entPhysicalClass"):
+                items = [item for item in items if item["entPhysicalClass"] == query["entPhysicalClass"]]
+            return self._ok("inventory", items)
+
+        return self._device(device, query, build)
+
+    def inventory_all(self, query, device):
+        def build(device_id, _):
+            items = self.fleet.inventory_of(device_id)
+            if query.get("entPhysicalClass"):
+                items = [item for item in items if item["entPhysicalClass"] == query["entPhysicalClass"]]
+            return self._ok("inventory", items)
+
+        return self._device(device, query, build)
+
+    def devicegroups(self, _query):
+        return self._ok(
+            "groups", [{"id": index, "name": name, "type": "static"} for index, name in enumerate(LOCATIONS, 1)]
+        )
+
+    def devicegroup(self, _query, name):
+        if name not in LOCATIONS:
+            return 404, {"status": "error", "message": "Device group not found"}
+        devices = range(LOCATIONS.index(name) + 1, self.fleet.devices + 1, len(LOCATIONS))
+        return self._ok("devices", [{"device_id": device_id} for device_id in devices])
+
+
+class FakeLibreNMS(ThreadingHTTPServer):
+    """
+    HTTP server answering the LibreNMS API from a Fleet.
+
+    :param address: Tuple of host and port to listen on, port 0 picks a free one
+    :param fleet: Fleet to serve
+    :param latency: Mean seconds every request is delayed by
+    :param jitter: Standard deviation of the delay, in seconds
+    :param error_rate: Fraction of requests answered with a 500 or a 503 instead
+    :param reuse_port: Allow other processes to listen on the same port, where the platform supports it
+    :param cache_size: Number of encoded responses kept
+    """
+
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(  # pylint: disable=R0913
+        self,
+        address,
+        fleet: Fleet,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        reuse_port: bool = False,
+        cache_size: int = 4096,
+    ):
+        self.reuse_port = reuse_port
+        super().__init__(address, _Handler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.random = Random(fleet.seed)
+        api = Api(fleet)
+        self.respond = lru_cache(maxsize=cache_size)(lambda path, query: _encode(*api(path, dict(query))))
+
+    def server_bind(self):
+        # Lets several server processes listen on one port, the kernel spreading the connections between them
+        if self.reuse_port and hasattr(socket, "SO_REUSEPORT"):
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
+
+    @property
+    def url(self):
+        """Base URL of the server, to pass to the endpoints."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def _encode(status: int, body):
+    if isinstance(body, bytes):
+        return status, "image/png", body
+    # Slashes are escaped the way PHP encodes JSON, which base64 images are full of
+    return status, "application/json", json.dumps(body).replace("/", "\\/").encode()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, so Nagle's algorithm would hold the body back for a delayed ACK
+    disable_nagle_algorithm = True
+
+    def do_GET(self):  # pylint: disable=C0103
+        """Answer a request from the fleet, after the injected latency and errors."""
+        server = self.server
+        if server.latency or server.jitter:
+            sleep(max(0.0, server.random.gauss(server.latency, server.jitter)))
+        if server.error_rate and server.random.random() < server.error_rate:
+            status = server.random.choice((500, 503))
+            self._send(status, b'{"status": "error", "message": "Injected error"}', {"Retry-After": "0"})
+            return
+        url = urlsplit(self.path)
+        status, content_type, body = server.respond(url.path.rstrip("/"), tuple(sorted(parse_qsl(url.query))))
+        self._send(status, body, content_type=content_type)
+
+    def _send(self, status: int, body: bytes, headers: dict = None, content_type: str = "application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=W0622
+        pass
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Add the arguments describing the fleet and the injected faults to a parser."""
+    parser.add_argument("--devices", type=int, default=200, help="number of devices in the fleet")
+    parser.add_argument("--ports", type=int, default=24, help="number of ports per device")
+    parser.add_argument("--fdb", type=int, default=2, help="number of FDB entries per port")
+    parser.add_argument("--logs", type=int, default=500, help="number of entries per device in each log")
+    parser.add_argument("--inventory", type=int, default=4, help="number of inventory modules per device")
+    parser.add_argument("--seed", type=int, default=0, help="seed the fleet is generated from")
+    parser.add_argument("--latency", type=float, default=0.0, help="mean seconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="standard deviation of the added latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests failing with 500/503")
+
+
+def create_server(arguments, host: str = "127.0.0.1", port: int = 0, reuse_port: bool = False):
+    """
+    Create a server for the fleet and faults described by parsed arguments, see add_arguments.
+
+    :param reuse_port: Allow other processes to listen on the same port, to serve from several processes
+    """
+    fleet = create_fleet(arguments)
+    return FakeLibreNMS((host, port), fleet, arguments.latency, arguments.jitter, arguments.error_rate, reuse_port)
+
+
+def create_fleet(arguments):
+    """Create the fleet described by parsed arguments, see add_arguments."""
+    return Fleet(arguments.devices, arguments.ports, arguments.fdb, arguments.logs, arguments.inventory, arguments.seed)
+
+
+def create_asgi_app(arguments, cache_size: int = 4096):
+    """
+    Create an ASGI application serving the fleet and faults described by parsed arguments, see add_arguments.
+    FakeLibreNMS only speaks HTTP/1.1, this serves the same data through an ASGI server speaking HTTP/2 as well,
+    such as hypercorn.
+    """
+    fleet = create_fleet(arguments)
+    api = Api(fleet)
+    random = Random(fleet.seed)
+    respond = lru_cache(maxsize=cache_size)(lambda path, query: _encode(*api(path, dict(query))))
+
+    async def app(scope, _receive, send):
+        if scope["type"] != "http":
+            return
+        if arguments.latency or arguments.jitter:
+            await asyncio.sleep(max(0.0, random.gauss(arguments.latency, arguments.jitter)))
+        if arguments.error_rate and random.random() < arguments.error_rate:
+            status, content_type, body = random.choice((500, 503)), "application/json", b'{"status": "error"}'
+        else:
+            # The raw path keeps the escaped slashes of interface names such as Gi1/0/1, the decoded one does not
+            path = scope["raw_path"].decode().rstrip("/")
+            status, content_type, body = respond(path, tuple(sorted(parse_qsl(scope["query_string"].decode()))))
+        headers = [(b"content-type", content_type.encode()), (b"content-length", str(len(body)).encode())]
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+    return app
+
+
+def start(arguments, host: str = "127.0.0.1", port: int = 0):
+    """Serve from a background thread, returning the server."""
+    server = create_server(arguments, host, port)
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--processes", type=int, default=1, help="number of processes serving the port")
+    add_arguments(parser)
+    arguments = parser.parse_args()
+    server = create_server(arguments, arguments.host, arguments.port, reuse_port=arguments.processes > 1)
+    print(f"Serving {arguments.devices} devices on {server.url}", flush=True)
+    for _ in range(arguments.processes - 1):
+        if os.fork() == 0:
+            break
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
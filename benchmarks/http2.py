@@ -0,0 +1,182 @@
+"""
+Compares the HTTP/1.1 connection pool with the HTTP/2 transport of librenms_handler.http2 under concurrency.
+
+Each scenario sends --requests requests from --workers threads, once through the default requests pool
+and once through create_http2_session(), reporting the throughput, the latency and the peak number of
+connections open to the server, as counted from /proc/net/tcp on Linux.
+The stand-in of fake_librenms.py only speaks HTTP/1.1, so the fleet is served here through hypercorn instead,
+which speaks both protocols, HTTP/2 being spoken with prior knowledge over plain http.
+
+Run it from the root of the repository with `python benchmarks/http2.py` after `pip install hypercorn httpx[http2]`,
+or against a real server such as LibreNMS behind nginx with `--url https://librenms.example.com --token ...`.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle, islice
+from threading import Event, Thread
+from time import perf_counter
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+# pylint: disable=C0413
+from fake_librenms import add_arguments, create_asgi_app, hostname
+from librenms_handler import Client
+from librenms_handler.http2 import create_http2_session
+from run import peak_rss, percentile, timed
+
+SCENARIOS = {
+    "get_device": lambda endpoint, device: endpoint.get_device(device),
+    "get_port_stats_by_port_hostname": lambda endpoint, device: endpoint.get_port_stats_by_port_hostname(
+        device, "Gi1/0/1"
+    ),
+    "get_health_graph": lambda endpoint, device: endpoint.get_health_graph(device, "device_temperature"),
+}
+TRANSPORTS = ("http1", "http2")
+
+
+def open_connections(port: int):
+    """Return the number of established TCP connections to a remote port, None where it cannot be read."""
+    count = 0
+    for table in ("/proc/net/tcp", "/proc/net/tcp6"):
+        try:
+            with open(table, encoding="ascii") as file:
+                next(file)
+                for line in file:
+                    fields = line.split()
+                    # Established connections whose remote end is the port, the server side of them is not counted
+                    if fields[3] == "01" and int(fields[2].rsplit(":", 1)[1], 16) == port:
+                        count += 1
+        except OSError:
+            return None
+    return count
+
+
+class ConnectionSampler(Thread):
+    """Samples the connections open to a port every few milliseconds, keeping the peak."""
+
+    def __init__(self, port: int, interval: float = 0.005):
+        super().__init__(daemon=True)
+        self.port = port
+        self.interval = interval
+        self.peak = open_connections(port)
+        self.stopped = Event()
+
+    def run(self):
+        while self.peak is not None and not self.stopped.wait(self.interval):
+            self.peak = max(self.peak, open_connections(self.port))
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.join()
+
+
+def client_options(arguments, transport: str):
+    """Return the Client arguments sending requests through the given transport."""
+    options = {"url": arguments.url, "token": arguments.token, "verify": not arguments.insecure}
+    if transport == "http1":
+        return {**options, "pool_maxsize": arguments.workers}
+    # HTTP/2 is only negotiated over TLS, plain http servers have to be spoken to with prior knowledge
+    http1 = urlsplit(arguments.url).scheme == "https"
+    return {**options, "session": create_http2_session(arguments.connections, arguments.connections, http1)}
+
+
+def benchmark(arguments):
+    """Run every scenario through every transport, yielding one result dictionary each."""
+    port = urlsplit(arguments.url).port or (443 if urlsplit(arguments.url).scheme == "https" else 80)
+    fleet = arguments.hostnames or [hostname(index) for index in range(arguments.devices)]
+    devices = list(islice(cycle(fleet), arguments.requests))
+    for method, call in SCENARIOS.items():
+        for transport in arguments.transports:
+            with Client(**client_options(arguments, transport)) as client, ThreadPoolExecutor(
+                arguments.workers
+            ) as executor:
+                endpoint = client.devices
+                timed(call, endpoint, devices[0])
+                with ConnectionSampler(port) as sampler:
+                    start = perf_counter()
+                    results = list(executor.map(lambda device: timed(call, endpoint, device), devices))
+                    elapsed = perf_counter() - start
+            latencies = sorted(latency for latency, _ in results)
+            yield {
+                "scenario": method,
+                "transport": transport,
+                "requests": len(latencies),
+                "errors": sum(not ok for _, ok in results),
+                "rps": len(latencies) / elapsed,
+                "p50_ms": percentile(latencies, 0.5) * 1000,
+                "p99_ms": percentile(latencies, 0.99) * 1000,
+                "connections": sampler.peak,
+                "peak_rss_mib": peak_rss(),
+            }
+
+
+def _serve(arguments, port: int):
+    # pylint: disable=C0415
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config
+
+    config = Config()
+    config.bind = [f"127.0.0.1:{port}"]
+    config.accesslog = None
+    config.errorlog = None
+    asyncio.run(serve(create_asgi_app(arguments), config))
+
+
+def start_server(arguments):
+    """Serve the fleet through hypercorn from another process, returning the process and the URL it answers on."""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = multiprocessing.Process(target=_serve, args=(arguments, port), daemon=True)
+    server.start()
+    for _ in range(300):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            break
+        except OSError:
+            server.join(0.05)
+    return server, f"http://127.0.0.1:{port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    add_arguments(parser)
+    parser.add_argument("--requests", type=int, default=1000, help="requests sent per scenario and transport")
+    parser.add_argument("--workers", type=int, default=64, help="threads sending the requests")
+    parser.add_argument("--connections", type=int, default=4, help="maximum connections of the HTTP/2 transport")
+    parser.add_argument("--transports", nargs="*", choices=TRANSPORTS, default=list(TRANSPORTS))
+    parser.add_argument("--url", help="benchmark a server that is already running instead of starting one")
+    parser.add_argument("--token", default="benchmark", help="API token of the server given with --url")
+    parser.add_argument("--insecure", action="store_true", help="do not verify the certificate of the server")
+    parser.add_argument("--hostnames", nargs="*", help="devices of the server given with --url to request")
+    arguments = parser.parse_args()
+
+    server = None
+    if not arguments.url:
+        server, arguments.url = start_server(arguments)
+
+    print(f"{'scenario':<34} {'transport':<10} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7} {'conns':>6}")
+    try:
+        for result in benchmark(arguments):
+            print(
+                f"{result['scenario']:<34} {result['transport']:<10} {result['rps']:>9.0f} {result['p50_ms']:>8.2f} "
+                f"{result['p99_ms']:>8.2f} {result['errors']:>7} {result['connections'] or 0:>6}",
+                flush=True,
+            )
+    finally:
+        if server:
+            server.terminate()
+
+
+if __name__ == "__main__":
+    main()
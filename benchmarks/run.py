@@ -0,0 +1,267 @@
+"""
+Measures the throughput, latency and memory of the endpoints against the synthetic LibreNMS of fake_librenms.py.
+
+Every scenario is run in three modes:
+serial sends each request on a new connection, the way a fresh session per call would,
+pooled sends them one after the other through one keep-alive session,
+and concurrent spreads them over --workers threads sharing one pool.
+The server runs in separate processes sharing one port,
+so that it does not compete with the client for the GIL and keeps up with the concurrent mode.
+Each scenario and mode is run --repeat times, each time in a fresh process of its own whose peak RSS is reported,
+so that the memory of one scenario is not hidden by the peak of an earlier one, and the median of the runs is kept.
+
+Run it from the root of the repository with `python benchmarks/run.py`, see --help for the fleet and fault options.
+Save the results with --json and compare a later run against them with --compare to catch regressions
+in throughput, p99 latency or peak RSS, changes smaller than --min-p99-ms and --min-rss-mib being noise.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import cycle, islice
+from statistics import median
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+# pylint: disable=C0413
+from fake_librenms import add_arguments, create_server, hostname
+from librenms_handler import Client
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+SCENARIOS = {
+    "arp": {"list_arp": lambda endpoint, device: endpoint.list_arp("172.16.0.0/12", device)},
+    "device_groups": {
+        "get_devicegroups": lambda endpoint, device: endpoint.get_devicegroups(),
+        "get_devices_by_group": lambda endpoint, device: endpoint.get_devices_by_group("London"),
+    },
+    "devices": {
+        "get_device": lambda endpoint, device: endpoint.get_device(device),
+        "get_device_fdb": lambda endpoint, device: endpoint.get_device_fdb(device),
+        "get_port_graphs": lambda endpoint, device: endpoint.get_port_graphs(device),
+        "list_devices": lambda endpoint, device: endpoint.list_devices(),
+    },
+    "inventory": {
+        "get_inventory": lambda endpoint, device: endpoint.get_inventory(device),
+        "get_inventory_for_device": lambda endpoint, device: endpoint.get_inventory_for_device(device),
+    },
+    "logs": {
+        "list_eventlog": lambda endpoint, device: endpoint.list_eventlog(device, limit=100),
+        "list_syslog": lambda endpoint, device: endpoint.list_syslog(device, limit=100),
+    },
+    "switching": {
+        "list_links": lambda endpoint, device: endpoint.list_links(),
+        "list_vlans": lambda endpoint, device: endpoint.list_vlans(),
+    },
+    "system": {"system": lambda endpoint, device: endpoint.system()},
+}
+MODES = ("serial", "pooled", "concurrent")
+
+
+def peak_rss():
+    """Return the peak resident set size of this process in MiB, None where it cannot be read."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(latencies, fraction: float):
+    """Return the latency below which the given fraction of the sorted latencies fall."""
+    return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] if latencies else 0.0
+
+
+def timed(call, endpoint, device):
+    """Run one call and return its latency and whether it succeeded, reading the whole body."""
+    start = perf_counter()
+    try:
+        response = call(endpoint, device)
+        ok = response.ok and bool(response.content)
+    except Exception:  # pylint: disable=broad-except
+        ok = False
+    return perf_counter() - start, ok
+
+
+def run_scenario(client_options: dict, name: str, call, devices, mode: str, workers: int):  # pylint: disable=R0913
+    """Send one request per device in devices with the given mode, returning the latencies and the error count."""
+    if mode == "serial":
+        results = []
+        for device in devices:
+            with Client(**client_options, pool_maxsize=1) as client:
+                results.append(timed(call, client.endpoint(name), device))
+    elif mode == "pooled":
+        with Client(**client_options, pool_maxsize=1) as client:
+            endpoint = client.endpoint(name)
+            results = [timed(call, endpoint, device) for device in devices]
+    else:
+        with Client(**client_options, pool_maxsize=workers) as client, ThreadPoolExecutor(workers) as executor:
+            endpoint = client.endpoint(name)
+            results = list(executor.map(lambda device: timed(call, endpoint, device), devices))
+    return sorted(latency for latency, _ in results), sum(not ok for _, ok in results)
+
+
+def measure(url: str, name: str, method: str, devices, mode: str, workers: int):  # pylint: disable=R0913
+    """Warm up and run one scenario, returning its latencies, error count, duration and the peak RSS of the process."""
+    client_options = {"url": url, "token": "benchmark"}
+    call = SCENARIOS[name][method]
+    with Client(**client_options) as client:
+        timed(call, client.endpoint(name), devices[0])
+    start = perf_counter()
+    latencies, errors = run_scenario(client_options, name, call, devices, mode, workers)
+    return latencies, errors, perf_counter() - start, peak_rss()
+
+
+def _median(values):
+    """Return the median of values, None if any of them is None, as peak_rss() is where it cannot be read."""
+    return None if None in values else median(values)
+
+
+def benchmark(arguments, url: str):
+    """
+    Run every selected scenario in every selected mode --repeat times, each run in a fresh process,
+    yielding one result dictionary holding the median of the runs.
+    """
+    fleet = [hostname(index) for index in range(arguments.devices)]
+    context = multiprocessing.get_context("spawn")
+    for name, calls in SCENARIOS.items():
+        if arguments.endpoints and name not in arguments.endpoints:
+            continue
+        for method in calls:
+            for mode in arguments.modes:
+                devices = list(islice(cycle(fleet), arguments.requests))
+                runs = []
+                for _ in range(arguments.repeat):
+                    with ProcessPoolExecutor(1, mp_context=context) as executor:
+                        runs.append(
+                            executor.submit(measure, url, name, method, devices, mode, arguments.workers).result()
+                        )
+                yield {
+                    "scenario": f"{name}.{method}",
+                    "mode": mode,
+                    "requests": len(devices),
+                    "runs": len(runs),
+                    "errors": sum(errors for _, errors, _, _ in runs),
+                    "rps": median(len(latencies) / elapsed for latencies, _, elapsed, _ in runs),
+                    "p50_ms": median(percentile(latencies, 0.5) * 1000 for latencies, _, _, _ in runs),
+                    "p99_ms": median(percentile(latencies, 0.99) * 1000 for latencies, _, _, _ in runs),
+                    "peak_rss_mib": _median([rss for _, _, _, rss in runs]),
+                }
+
+
+# Metrics compared against the baseline, their unit and whether a lower value is the regression
+COMPARED = (("rps", "req/s", True), ("p99_ms", "ms p99", False), ("peak_rss_mib", "MiB RSS", False))
+
+
+def regressions(results, baseline, tolerance: float, floors: dict = None):
+    """
+    Return a message for every result whose throughput fell, or whose p99 latency or peak RSS rose,
+    by more than tolerance compared to the baseline.
+
+    :param floors: Smallest absolute change of a metric that counts, by metric name, e.g. {"p99_ms": 5.0}.
+    A single p99 of sub-millisecond local calls easily doubles from one run to the next without any regression.
+    """
+    floors = floors or {}
+    previous = {(result["scenario"], result["mode"]): result for result in baseline}
+    messages = []
+    for result in results:
+        before = previous.get((result["scenario"], result["mode"]))
+        if not before:
+            continue
+        for metric, unit, lower_is_worse in COMPARED:
+            now, was = result.get(metric), before.get(metric)
+            if now is None or was is None or abs(now - was) < floors.get(metric, 0.0):
+                continue
+            if (now < was * (1 - tolerance)) if lower_is_worse else (now > was * (1 + tolerance)):
+                messages.append(f"{result['scenario']} {result['mode']}: {now:.1f} {unit}, was {was:.1f} {unit}")
+    return messages
+
+
+def _serve(arguments, port: int, ready):
+    server = create_server(arguments, port=port, reuse_port=arguments.server_processes > 1)
+    ready.put(server.url)
+    server.serve_forever()
+
+
+def start_servers(arguments):
+    """Start --server-processes processes serving one port, returning them and the URL they answer on."""
+    ready = multiprocessing.Queue()
+    servers = []
+    url = None
+    for _ in range(arguments.server_processes):
+        port = int(url.rsplit(":", 1)[1]) if url else 0
+        servers.append(multiprocessing.Process(target=_serve, args=(arguments, port, ready), daemon=True))
+        servers[-1].start()
+        url = ready.get(timeout=30)
+    return servers, url
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    add_arguments(parser)
+    parser.add_argument("--requests", type=int, default=500, help="requests sent per scenario and mode")
+    parser.add_argument("--workers", type=int, default=16, help="threads used by the concurrent mode")
+    parser.add_argument(
+        "--endpoints", nargs="*", choices=sorted(SCENARIOS), help="endpoints to benchmark, all if unset"
+    )
+    parser.add_argument("--modes", nargs="*", choices=MODES, default=list(MODES), help="modes to run")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per scenario and mode, whose median is reported")
+    parser.add_argument(
+        "--server-processes",
+        type=int,
+        default=max(1, min(4, (os.cpu_count() or 2) // 2)),
+        help="processes serving the stand-in, so that it is not the bottleneck",
+    )
+    parser.add_argument("--url", help="benchmark a server that is already running instead of starting one")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--compare", help="results of an earlier run to compare against, written with --json")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="fraction of throughput a scenario may lose, or of p99 latency and peak RSS it may gain",
+    )
+    parser.add_argument(
+        "--min-p99-ms", type=float, default=5.0, help="p99 latency changes smaller than this are ignored as noise"
+    )
+    parser.add_argument(
+        "--min-rss-mib", type=float, default=2.0, help="peak RSS changes smaller than this are ignored as noise"
+    )
+    arguments = parser.parse_args()
+
+    servers, url = ([], arguments.url) if arguments.url else start_servers(arguments)
+
+    print(f"{'scenario':<40} {'mode':<10} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7} {'RSS MiB':>8}")
+    results = []
+    try:
+        for result in benchmark(arguments, url):
+            results.append(result)
+            print(
+                f"{result['scenario']:<40} {result['mode']:<10} {result['rps']:>9.0f} {result['p50_ms']:>8.2f} "
+                f"{result['p99_ms']:>8.2f} {result['errors']:>7} {result['peak_rss_mib'] or 0:>8.1f}",
+                flush=True,
+            )
+    finally:
+        for server in servers:
+            server.terminate()
+
+    if arguments.json:
+        with open(arguments.json, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    if arguments.compare:
+        with open(arguments.compare, encoding="utf-8") as file:
+            floors = {"p99_ms": arguments.min_p99_ms, "peak_rss_mib": arguments.min_rss_mib}
+            messages = regressions(results, json.load(file), arguments.tolerance, floors)
+        for message in messages:
+            print(f"REGRESSION {message}")
+        if messages:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
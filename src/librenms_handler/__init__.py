@@ -1,2 +1,3 @@
 """Imports all the modules that are ready for use"""
 from librenms_handler.librenms import LibreNMS
+from librenms_handler.client import Client
@@ -0,0 +1,12 @@
+"""Imports all the modules that are ready for use"""
+from librenms_handler.aio.aio import (
+    AsyncARP,
+    AsyncDeviceGroups,
+    AsyncDevices,
+    AsyncInventory,
+    AsyncLibreNMS,
+    AsyncLocations,
+    AsyncLogs,
+    AsyncSwitching,
+    AsyncSystem,
+)
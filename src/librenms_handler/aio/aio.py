@@ -0,0 +1,190 @@
+"""Includes the non-blocking flavour of every endpoint, for use from asyncio."""
+try:
+    import httpx
+except ImportError as error:  # pragma: no cover
+    raise ImportError(
+        "The asyncio endpoints require httpx, install it with `pip install librenms-handler[async]`"
+    ) from error
+
+from functools import partial
+
+from librenms_handler.arp import ARP
+from librenms_handler.device_groups import DeviceGroups
+from librenms_handler.devices import Devices
+from librenms_handler.inventory import Inventory
+from librenms_handler.locations import Locations
+from librenms_handler.logs import Logs
+from librenms_handler.metrics import caller_name
+from librenms_handler.switching import Switching
+from librenms_handler.system import System
+
+# Options of the blocking endpoints whose layers wrap the requests session, which the async transport bypasses
+UNSUPPORTED_OPTIONS = ("session", "cache", "retry", "throttle", "coalesce")
+# Helpers of the blocking endpoints that read the responses of other methods, which are awaitables here
+BLOCKING_ONLY = (
+    "arp_records",
+    "build_topology",
+    "bulk",
+    "crawl_sensors",
+    "device_records",
+    "export_graphs",
+    "fdb_records",
+    "fetch_oxidized_configs",
+    "follow",
+    "get_group_members",
+    "get_port_columns",
+    "get_port_stats_columns",
+    "import_devices",
+    "inventory_records",
+    "iter_alertlog",
+    "iter_authlog",
+    "iter_devices",
+    "iter_eventlog",
+    "iter_fdb_detail",
+    "iter_links",
+    "iter_sensors",
+    "iter_syslog",
+    "link_records",
+    "port_records",
+    "refresh_topology",
+    "sync_group",
+    "sync_groups",
+    "walk_inventory",
+)
+
+
+def create_client(verify=True, max_connections: int = 100, max_keepalive_connections: int = 20):
+    """
+    Create a non-blocking client that can be shared between async endpoint instances.
+
+    :param verify: Whether to verify the server's TLS certificate
+    :param max_connections: Maximum number of connections open at once, i.e. requests in flight
+    :param max_keepalive_connections: Maximum number of idle connections kept alive
+    """
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive_connections)
+    return httpx.AsyncClient(verify=verify, limits=limits)
+
+
+def _blocking_only(name: str):
+    """Return a method standing in for a helper of the blocking endpoints, raising a TypeError when called."""
+
+    def method(self, *_args, **_kwargs):
+        raise TypeError(
+            f"{type(self).__name__}.{name}() is only available on the blocking endpoint {type(self).__name__[5:]}"
+        )
+
+    method.__name__ = name
+    method.__doc__ = f"Not available on the async endpoints, use the blocking endpoint's {name}() instead."
+    return method
+
+
+def _without_none(values):
+    """Drop unset values the same way requests does for query strings and form bodies."""
+    if isinstance(values, dict):
+        return {key: value for key, value in values.items() if value is not None}
+    return values
+
+
+class AsyncLibreNMS:
+    """
+    Swaps the blocking transport of an endpoint for a shared httpx.AsyncClient.
+    Every endpoint method keeps its signature but returns an awaitable of an httpx.Response.
+    The helpers built on top of the methods, such as bulk() or the iter_* generators, are only available on the
+    blocking endpoints and raise a TypeError here, see BLOCKING_ONLY.
+    The session, cache, retry, throttle and coalesce options are not supported either, no requests session is
+    created, and close() raises a TypeError as the client can only be closed by awaiting aclose().
+    """
+
+    headers: dict
+    metrics = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name in BLOCKING_ONLY:
+            if hasattr(cls, name):
+                setattr(cls, name, _blocking_only(name))
+
+    def __init__(  # pylint: disable=R0913
+        self,
+        url=None,
+        token=None,
+        verify=True,
+        client: httpx.AsyncClient = None,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        **kwargs,
+    ):
+        """
+        :param client: Existing client to send requests through.
+        Pass the client of another async endpoint instance to share one connection pool between them.
+        :param max_connections: Maximum number of requests in flight, ignored if client is given
+        :param max_keepalive_connections: Maximum number of idle connections kept alive, ignored if client is given
+        """
+        unsupported = [option for option in UNSUPPORTED_OPTIONS if kwargs.get(option) is not None]
+        if unsupported:
+            raise TypeError(f"{type(self).__name__} does not support the {', '.join(unsupported)} option(s)")
+        super().__init__(url, token, verify, **kwargs)
+        self.client = client or create_client(verify, max_connections, max_keepalive_connections)
+
+    @staticmethod
+    def _create_session(pool_connections: int, pool_maxsize: int, pool_block: bool):  # pylint: disable=W0613
+        """Requests are sent through the httpx client, so no requests session is created."""
+        return None
+
+    def _request(self, method: str, url: str, **kwargs):
+        """Send a request through the shared async client, returning an awaitable."""
+        kwargs.pop("verify", None)
+        kwargs.pop("stream", None)
+        kwargs.setdefault("headers", self.headers)
+        kwargs["params"] = _without_none(kwargs.get("params"))
+        kwargs["data"] = _without_none(kwargs.get("data"))
+        if self.metrics is None:
+            return self.client.request(method, url, **kwargs)
+        send = partial(self.client.request, method, url, **kwargs)
+        return self.metrics.atrack(type(self).__name__, caller_name(), method, send)
+
+    def close(self):
+        """The client of an async endpoint can only be closed from the event loop, raising a TypeError."""
+        raise TypeError(f"{type(self).__name__}.close() cannot close an async client, await aclose() instead")
+
+    async def aclose(self):
+        """Close the pooled connections held by the client of this instance."""
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+
+class AsyncARP(AsyncLibreNMS, ARP):  # pylint: disable=R0903
+    """Includes all the methods available to the ARP endpoint, as coroutines."""
+
+
+class AsyncDeviceGroups(AsyncLibreNMS, DeviceGroups):
+    """Includes all the methods available to the DeviceGroups endpoint, as coroutines."""
+
+
+class AsyncDevices(AsyncLibreNMS, Devices):  # pylint: disable=R0904
+    """Includes all the methods available to the Devices endpoint, as coroutines."""
+
+
+class AsyncInventory(AsyncLibreNMS, Inventory):
+    """Includes all the methods available to the Inventory endpoint, as coroutines."""
+
+
+class AsyncLocations(AsyncLibreNMS, Locations):
+    """Includes all the methods available to the Locations endpoint, as coroutines."""
+
+
+class AsyncLogs(AsyncLibreNMS, Logs):
+    """Includes all the methods available to the Logs endpoint, as coroutines."""
+
+
+class AsyncSwitching(AsyncLibreNMS, Switching):
+    """Includes all the methods available to the Switching endpoint, as coroutines."""
+
+
+class AsyncSystem(AsyncLibreNMS, System):  # pylint: disable=R0903
+    """Includes all the methods available to the System endpoint, as coroutines."""
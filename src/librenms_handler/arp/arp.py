@@ -1,18 +1,17 @@
 """Includes all the methods available to the ARP endpoint."""
-from requests import get
-
 from librenms_handler import LibreNMS
+from librenms_handler.models import ArpEntry
 
 
 class ARP(LibreNMS):  # pylint: disable=R0903
     """Includes all the methods available to the ARP endpoint."""
 
-    def __init__(self, url=None, token=None, verify=True):
-        super().__init__(url, token, verify)
+    def __init__(self, url=None, token=None, verify=True, **kwargs):
+        super().__init__(url, token, verify, **kwargs)
         self.base_url = self.url
         self.url = f"{self.url}/api/v0/resources/ip/arp"
 
-    def list_arp(self, query: str):
+    def list_arp(self, query: str, device: str = None):
         """
         Retrieve a specific ARP entry or all ARP entries for a device
 
@@ -23,11 +22,25 @@ class ARP(LibreNMS):  # pylint: disable=R0903
         - CIDR network (192.168.1.0/24)
         - `all` and set `?device=hostname` (or device ID)
 
-        :param query: device if you specify all for the query then you need to populate this with the hostname
+        :param query: IP address, MAC address, CIDR network or `all`
+        :param device: if you specify all for the query then you need to populate this with the hostname
         or id of the device.
         """
-        return get(
+        parameters = dict({"device": device})
+        return self._get(
             f"{self.url}/{query}",
+            parameters,
             headers=self.headers,
             verify=self.verify,
         )
+
+    def arp_records(self, query: str):
+        """
+        Retrieve ARP entries as compact ArpEntry records.
+        Accepts the same queries as list_arp.
+
+        :param query: IP address, MAC address or CIDR network to look up
+        """
+        response = self.list_arp(query)
+        response.raise_for_status()
+        return list(ArpEntry.from_items(response.json().get("arp") or []))
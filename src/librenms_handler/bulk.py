@@ -0,0 +1,38 @@
+"""Runs one endpoint method over many devices with a bounded number of requests in flight."""
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+
+BulkResult = namedtuple("BulkResult", ["item", "result", "error"])
+BulkResult.__doc__ = """
+Outcome of one call made by bulk().
+
+:param item: The device (or other argument) the call was made for
+:param result: Return value of the call, None if it raised
+:param error: Exception raised by the call, None if it succeeded
+"""
+
+
+def bulk(func, items, max_workers: int = 8, **kwargs):
+    """
+    Call func(item, **kwargs) for every item using a pool of threads, yielding a BulkResult per item as it completes.
+    Only max_workers calls are submitted at once and items are pulled lazily,
+    so memory stays flat no matter how long the iterable is.
+    An exception raised for one item is reported in its BulkResult and does not stop the others.
+
+    :param func: Callable taking the item as its first argument, e.g. Devices.get_device
+    :param items: Iterable of items to call func with, e.g. device hostnames or IDs
+    :param max_workers: Maximum number of calls running at once
+    :param kwargs: Extra keyword arguments passed to every call
+    """
+    items = iter(items)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {executor.submit(func, item, **kwargs): item for item in islice(items, max_workers)}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = pending.pop(future)
+                error = future.exception()
+                yield BulkResult(item, None if error else future.result(), error)
+            for item in islice(items, len(done)):
+                pending[executor.submit(func, item, **kwargs)] = item
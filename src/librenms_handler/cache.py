@@ -0,0 +1,143 @@
+"""Opt-in response cache for endpoints whose data rarely changes."""
+from collections import Counter, OrderedDict
+from functools import wraps
+from inspect import signature
+from threading import Lock
+from time import monotonic
+
+
+class ResponseCache:
+    """
+    Bounded LRU cache of responses with a time-to-live per tag.
+    One cache can be shared between endpoint instances by passing it to each of them as cache=.
+
+    :param maxsize: Maximum number of responses held, the least recently used is evicted first
+    :param ttl: Seconds a response is kept for when its tag has no TTL of its own
+    :param ttls: Mapping of tag (e.g. "system", "locations") to the seconds its responses are kept for
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0, ttls: dict = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.ttls = dict(ttls or {})
+        self.hits = Counter()
+        self.misses = Counter()
+        self._entries = OrderedDict()
+        self._tags = {}
+        self._lock = Lock()
+
+    def get(self, tag: str, key):
+        """Return the cached value for key, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < monotonic():
+                if entry is not None:
+                    self._discard(key)
+                self.misses[tag] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits[tag] += 1
+            return entry[2]
+
+    def set(self, tag: str, key, value):
+        """Store value under key, evicting the least recently used entries above maxsize."""
+        with self._lock:
+            self._entries[key] = (monotonic() + self.ttls.get(tag, self.ttl), tag, value)
+            self._entries.move_to_end(key)
+            self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._discard(next(iter(self._entries)))
+
+    def invalidate(self, *tags: str):
+        """Drop every entry stored under one of the given tags."""
+        with self._lock:
+            for tag in tags:
+                for key in self._tags.pop(tag, ()):
+                    self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every entry, keeping the hit and miss counters."""
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def stats(self):
+        """Return the hits, misses and number of entries held for every tag seen so far."""
+        with self._lock:
+            tags = set(self.hits) | set(self.misses) | set(self._tags)
+            return {
+                tag: {
+                    "hits": self.hits[tag],
+                    "misses": self.misses[tag],
+                    "size": len(self._tags.get(tag, ())),
+                }
+                for tag in sorted(tags)
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _discard(self, key):
+        """Remove key from the entries and the tag index, the lock must be held."""
+        _, tag, _ = self._entries.pop(key)
+        keys = self._tags.get(tag)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._tags[tag]
+
+
+def cached(tag: str):
+    """
+    Cache the successful responses of an endpoint method under tag, when the instance has a cache.
+    Calls made with stream=True, as a keyword or a positional argument, are never cached,
+    as their body can only be read once.
+
+    :param tag: Name the responses are stored, expired and invalidated under
+    """
+
+    def decorator(method):
+        # Position of stream among the arguments following self, None if the method has no such parameter
+        names = list(signature(method).parameters)[1:]
+        position = names.index("stream") if "stream" in names else None
+
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            streamed = kwargs.get("stream") or (position is not None and len(args) > position and args[position])
+            if self.cache is None or streamed:
+                return method(self, *args, **kwargs)
+            key = (tag, self.url, self.token, method.__name__, args, tuple(sorted(kwargs.items())))
+            try:
+                response = self.cache.get(tag, key)
+            except TypeError:
+                return method(self, *args, **kwargs)
+            if response is None:
+                response = method(self, *args, **kwargs)
+                if getattr(response, "ok", False):
+                    self.cache.set(tag, key, response)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def invalidates(*tags: str):
+    """
+    Drop the cached responses of the given tags whenever an endpoint method is called.
+
+    :param tags: Tags whose responses are made stale by the method
+    """
+
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                if self.cache is not None:
+                    self.cache.invalidate(*tags)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,175 @@
+"""Records API exchanges to a compressed cassette and replays them offline, as transport adapters of a session."""
+import base64
+import gzip
+import hashlib
+import json
+from io import BytesIO
+from threading import Lock
+from time import perf_counter, sleep
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from requests import Session
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException
+from urllib3 import HTTPResponse
+
+# Bodies are stored decoded, so the headers describing the encoding on the wire no longer apply
+_WIRE_HEADERS = {"content-encoding", "transfer-encoding", "content-length", "connection", "keep-alive"}
+
+
+class CassetteMiss(RequestException):
+    """Raised when replaying a request that the cassette holds no response for, and never retried."""
+
+
+def request_key(method: str, url: str, body=None):
+    """
+    Return the key a request is recorded under: its method, its URL with the query parameters sorted,
+    and a digest of its body when it has one.
+    """
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    key = f"{method.upper()} {urlunsplit((parts.scheme, parts.netloc, parts.path, query, ''))}"
+    if body:
+        key += f" {hashlib.sha256(body if isinstance(body, bytes) else body.encode()).hexdigest()[:16]}"
+    return key
+
+
+def _encode_body(content: bytes):
+    """Return the fields storing a body, as text when it is UTF-8 so that it compresses best."""
+    try:
+        return {"text": content.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"base64": base64.b64encode(content).decode("ascii")}
+
+
+def _decode_body(entry: dict):
+    return entry["text"].encode("utf-8") if "text" in entry else base64.b64decode(entry["base64"])
+
+
+def load_cassette(path: str):
+    """
+    Read a cassette into a mapping of request key to the list of its recorded exchanges, in recording order.
+    A cassette cut short, such as by a recording that was interrupted, is read up to its last complete exchange.
+    """
+    index = {}
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        try:
+            for line in file:
+                entry = json.loads(line)
+                index.setdefault(entry["key"], []).append(entry)
+        except (EOFError, gzip.BadGzipFile, json.JSONDecodeError):
+            pass
+    return index
+
+
+class RecordingAdapter(HTTPAdapter):
+    """
+    Sends requests like HTTPAdapter, appending every exchange to a gzip compressed cassette of JSON lines.
+    The body of each response is read in full to be recorded, then handed over as usual, streamed or not.
+    The cassette is complete once the adapter, or the session it is mounted on, is closed.
+
+    :param path: Path of the cassette, appended to if it exists
+    :param kwargs: Arguments of HTTPAdapter, such as pool_maxsize
+    """
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self._file = gzip.open(path, "at", encoding="utf-8")
+        self._lock = Lock()
+
+    def send(self, request, **kwargs):  # pylint: disable=W0221
+        start = perf_counter()
+        response = super().send(request, **kwargs)
+        content = response.content
+        entry = {
+            "key": request_key(request.method, request.url, request.body),
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": {name: value for name, value in response.headers.items() if name.lower() not in _WIRE_HEADERS},
+            "elapsed": perf_counter() - start,
+            **_encode_body(content),
+        }
+        with self._lock:
+            self._file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        return response
+
+    def close(self):
+        super().close()
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+class ReplayAdapter(HTTPAdapter):
+    """
+    Answers requests from a cassette written by RecordingAdapter, without any network access.
+    Exchanges recorded several times for one request are replayed in their recording order,
+    the last one being repeated once they are exhausted, so polling loops see the same sequence as when recorded.
+
+    :param path: Path of the cassette
+    :param timing: Multiplier of the recorded latency each response is delayed by,
+    0 to replay at full speed and 1 to replay with the original timing
+    """
+
+    def __init__(self, path: str, timing: float = 0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self.timing = timing
+        self.index = load_cassette(path)
+        self._played = {}
+        self._lock = Lock()
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        key = request_key(request.method, request.url, request.body)
+        with self._lock:
+            entries = self.index.get(key)
+            if not entries:
+                raise CassetteMiss(f"{self.path} holds no response for {key}", request=request)
+            position = self._played.get(key, 0)
+            self._played[key] = position + 1
+        entry = entries[min(position, len(entries) - 1)]
+        if self.timing:
+            sleep(entry["elapsed"] * self.timing)
+        body = _decode_body(entry)
+        raw = HTTPResponse(
+            body=BytesIO(body),
+            headers={**entry["headers"], "Content-Length": str(len(body))},
+            status=entry["status"],
+            reason=entry["reason"],
+            preload_content=False,
+            decode_content=False,
+        )
+        return self.build_response(request, raw)
+
+    def rewind(self):
+        """Replay every exchange from the start again."""
+        with self._lock:
+            self._played.clear()
+
+
+def _mounted(adapter: HTTPAdapter):
+    session = Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def create_recording_session(path: str, pool_connections: int = 10, pool_maxsize: int = 10, pool_block: bool = False):
+    """
+    Create a session recording every exchange to the cassette at path, to pass as session= to an endpoint or a Client.
+    Close the session to complete the cassette.
+    """
+    return _mounted(
+        RecordingAdapter(path, pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+    )
+
+
+def create_replay_session(path: str, timing: float = 0.0):
+    """
+    Create a session answering from the cassette at path, to pass as session= to an endpoint or a Client.
+
+    :param path: Path of a cassette written through create_recording_session
+    :param timing: 0 to replay at full speed, 1 for the original timing, see ReplayAdapter
+    """
+    return _mounted(ReplayAdapter(path, timing))
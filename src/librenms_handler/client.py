@@ -0,0 +1,112 @@
+"""Single entry point to every endpoint, sharing one configuration, session and cache between them."""
+from importlib import import_module
+from os import getenv
+from threading import Lock
+
+from librenms_handler.librenms import create_session
+
+ENDPOINTS = {
+    "arp": ("librenms_handler.arp", "ARP"),
+    "device_groups": ("librenms_handler.device_groups", "DeviceGroups"),
+    "devices": ("librenms_handler.devices", "Devices"),
+    "inventory": ("librenms_handler.inventory", "Inventory"),
+    "locations": ("librenms_handler.locations", "Locations"),
+    "logs": ("librenms_handler.logs", "Logs"),
+    "switching": ("librenms_handler.switching", "Switching"),
+    "system": ("librenms_handler.system", "System"),
+}
+
+
+class Client:  # pylint: disable=R0902
+    """
+    Gives access to every endpoint as an attribute, e.g. client.devices or client.logs.
+    An endpoint module is only imported, and its instance created, the first time its attribute is accessed,
+    so a short-lived script only pays for the endpoints it uses.
+    Every endpoint shares the URL, token, session, cache, retry policy, throttle, metrics and request coalescing
+    of the client. LIBRENMS_URL and LIBRENMS_TOKEN are read once by the client, and the endpoints share its headers.
+    """
+
+    def __init__(  # pylint: disable=R0913
+        self,
+        url=None,
+        token=None,
+        verify=True,
+        session=None,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        cache=None,
+        retry=None,
+        throttle=None,
+        metrics=None,
+        coalesce=None,
+    ):
+        """
+        :param url: Full URL to the target LibreNMS instance, LIBRENMS_URL takes precedence when set
+        :param token: Token generated from the LibreNMS api-access page, LIBRENMS_TOKEN takes precedence when set
+        :param verify: Whether to verify the server's TLS certificate
+        :param session: Existing session to send requests through, a pooled one is created if not given
+        :param pool_connections: Number of per-host connection pools to cache, ignored if session is given
+        :param pool_maxsize: Maximum number of connections kept alive per host, ignored if session is given
+        :param pool_block: Block when the pool is exhausted, ignored if session is given
+        :param cache: librenms_handler.cache.ResponseCache shared by every endpoint
+        :param retry: librenms_handler.resilience.RetryPolicy shared by every endpoint
+        :param throttle: librenms_handler.throttle.Throttle shared by every endpoint
+        :param metrics: librenms_handler.metrics.MetricsRegistry shared by every endpoint
+        :param coalesce: librenms_handler.coalesce.SingleFlight shared by every endpoint
+        """
+        self.url = getenv("LIBRENMS_URL") or url
+        self.token = getenv("LIBRENMS_TOKEN") or token
+        self.headers = {"X-Auth-Token": self.token}
+        self.verify = verify
+        self.session = session or create_session(pool_connections, pool_maxsize, pool_block)
+        self.cache = cache
+        self.retry = retry
+        self.throttle = throttle
+        self.metrics = metrics
+        self.coalesce = coalesce
+        self._lock = Lock()
+
+    def endpoint(self, name: str):
+        """
+        Return the instance of an endpoint, creating it on first use.
+
+        :param name: Name of the endpoint, one of the keys of ENDPOINTS
+        """
+        if name not in ENDPOINTS:
+            raise AttributeError(f"{type(self).__name__!r} object has no endpoint {name!r}")
+        with self._lock:
+            if name not in self.__dict__:
+                module, cls = ENDPOINTS[name]
+                self.__dict__[name] = getattr(import_module(module), cls)(
+                    self.url,
+                    self.token,
+                    self.verify,
+                    session=self.session,
+                    cache=self.cache,
+                    retry=self.retry,
+                    throttle=self.throttle,
+                    metrics=self.metrics,
+                    coalesce=self.coalesce,
+                    headers=self.headers,
+                )
+        return self.__dict__[name]
+
+    def __getattr__(self, name):
+        # Only called for missing attributes, so endpoints created before are found directly in __dict__
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self.endpoint(name)
+
+    def __dir__(self):
+        return sorted(set(super().__dir__()) | set(ENDPOINTS))
+
+    def close(self):
+        """Close the pooled connections shared by every endpoint."""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
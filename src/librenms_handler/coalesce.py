@@ -0,0 +1,83 @@
+"""Opt-in coalescing of identical GET requests sent at the same time."""
+from collections import Counter
+from concurrent.futures import Future
+from copy import copy
+from threading import Lock
+
+
+def request_key(url: str, params=None, headers=None):
+    """
+    Return the key identical requests share: the URL, the query parameters and the token,
+    or None when the parameters cannot be compared.
+    """
+    token = (headers or {}).get("X-Auth-Token")
+    if params is None or isinstance(params, (str, bytes)):
+        key = (url, params, token)
+    else:
+        items = params.items() if isinstance(params, dict) else params
+        key = (url, tuple(sorted((name, value) for name, value in items if value is not None)), token)
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+class SingleFlight:
+    """
+    Lets concurrent identical GET requests share one request in flight.
+    The first caller sends the request and every caller arriving before it completes waits for it,
+    receiving a copy of the same response, body included, or the same exception.
+    Requests are only shared while they are in flight, nothing is kept once they complete, see ResponseCache for that.
+    One instance can be shared between endpoint instances by passing it to each of them as coalesce=.
+
+    :param sent: Counter of the requests sent, per endpoint
+    :param shared: Counter of the requests answered by a request another caller sent, per endpoint
+    """
+
+    def __init__(self):
+        self.sent = Counter()
+        self.shared = Counter()
+        self._calls = {}
+        self._lock = Lock()
+
+    def call(self, endpoint: str, key, send):
+        """
+        Return the response of send(), or of the identical request already in flight.
+
+        :param endpoint: Name the request is counted under
+        :param key: Key identical requests share, see request_key
+        :param send: Callable sending the request and returning its response
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+                self.sent[endpoint] += 1
+            else:
+                self.shared[endpoint] += 1
+        if not leader:
+            return copy(future.result())
+        try:
+            response = send()
+        except BaseException as error:
+            self._landed(key)
+            future.set_exception(error)
+            raise
+        self._landed(key)
+        future.set_result(response)
+        return response
+
+    def _landed(self, key):
+        """Forget a request before its callers are woken up, so that later callers send a new one."""
+        with self._lock:
+            del self._calls[key]
+
+    def stats(self):
+        """Return the requests sent and shared for every endpoint seen so far."""
+        with self._lock:
+            return {
+                endpoint: {"sent": self.sent[endpoint], "shared": self.shared[endpoint]}
+                for endpoint in sorted(set(self.sent) | set(self.shared))
+            }
@@ -0,0 +1,83 @@
+"""Builds column-oriented tables of port statistics for vectorised calculations."""
+from array import array
+from math import nan
+
+
+# Identifiers, sizes, counters and rates of the ports table; every other field is text, however numeric it looks
+NUMERIC_FIELDS = frozenset(("port_id", "device_id", "ifIndex", "ifSpeed", "ifHighSpeed", "ifMtu"))
+NUMERIC_PREFIXES = ("ifIn", "ifOut", "ifHC")
+NUMERIC_SUFFIXES = ("_rate", "_delta", "_prev")
+
+
+def is_numeric(field: str):
+    """Return whether port_columns builds a typed array for a field of the ports table."""
+    return field in NUMERIC_FIELDS or field.startswith(NUMERIC_PREFIXES) or field.endswith(NUMERIC_SUFFIXES)
+
+
+def port_columns(ports, columns, numeric=None):
+    """
+    Turn port records into one contiguous column per field.
+    The type of a column depends on its name only, never on its values, so that an ifName of "1" stays text:
+    numeric fields become an array.array of doubles, with missing and unparsable values as NaN,
+    and the other fields (ifName, ifAlias, ...) a plain list of the values as returned.
+
+    :param ports: Iterable of port dictionaries, e.g. the "ports" of get_port_graphs or a streamed response
+    :param columns: Names of the fields to extract, either a list or a comma separated string
+    :param numeric: Names of the fields to build typed arrays for, see is_numeric if not given
+    """
+    if isinstance(columns, str):
+        columns = [column.strip() for column in columns.split(",")]
+    numeric = set(filter(is_numeric, columns) if numeric is None else numeric)
+    table = {column: array("d") if column in numeric else [] for column in columns}
+    for port in ports:
+        for column in columns:
+            value = port.get(column)
+            values = table[column]
+            if column in numeric:
+                try:
+                    value = nan if value is None or value == "" else float(value)
+                except (TypeError, ValueError):
+                    value = nan
+            values.append(value)
+    return table
+
+
+def to_numpy(table: dict):
+    """
+    Convert a table built by port_columns to NumPy arrays, sharing the memory of the numeric columns.
+    Requires numpy to be installed.
+    """
+    try:
+        import numpy  # pylint: disable=C0415
+    except ImportError as error:
+        raise ImportError(
+            "to_numpy requires numpy, install it with `pip install librenms-handler[columnar]`"
+        ) from error
+    return {
+        column: numpy.frombuffer(values, dtype=numpy.float64) if isinstance(values, array) else numpy.array(values)
+        for column, values in table.items()
+    }
+
+
+def to_arrow(table: dict):
+    """
+    Convert a table built by port_columns to a pyarrow.Table, sharing the memory of the numeric columns.
+    Requires pyarrow to be installed.
+    """
+    try:
+        import pyarrow  # pylint: disable=C0415
+    except ImportError as error:
+        raise ImportError(
+            "to_arrow requires pyarrow, install it with `pip install librenms-handler[columnar]`"
+        ) from error
+    return pyarrow.table(
+        {
+            column: pyarrow.Array.from_buffers(pyarrow.float64(), len(values), [None, pyarrow.py_buffer(values)])
+            if isinstance(values, array)
+            else pyarrow.array(values)
+            for column, values in table.items()
+        }
+    )
+
+
+BACKENDS = {"array": lambda table: table, "numpy": to_numpy, "arrow": to_arrow}
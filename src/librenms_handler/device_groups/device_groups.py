@@ -1,25 +1,38 @@
 """Includes all the methods available to the DeviceGroups endpoint."""
-from requests import delete, get, patch, post
+from collections import namedtuple
 
 from librenms_handler import LibreNMS
+from librenms_handler.bulk import bulk
+from librenms_handler.cache import cached, invalidates
+
+GroupSync = namedtuple("GroupSync", ["name", "added", "removed"])
+GroupSync.__doc__ = """
+Changes made to one device group by DeviceGroups.sync_groups().
+
+:param name: Name of the device group
+:param added: Sorted device IDs added to the group
+:param removed: Sorted device IDs removed from the group
+"""
 
 
 class DeviceGroups(LibreNMS):
     """Includes all the methods available to the DeviceGroups endpoint."""
 
-    def __init__(self, url=None, token=None, verify=True):
-        super().__init__(url, token, verify)
+    def __init__(self, url=None, token=None, verify=True, **kwargs):
+        super().__init__(url, token, verify, **kwargs)
         self.base_url = self.url
         self.url = f"{self.url}/api/v0/devicegroups"
 
+    @cached("devicegroups")
     def get_devicegroups(self):
         """List all device groups."""
-        return get(
+        return self._get(
             self.url,
             headers=self.headers,
             verify=self.verify,
         )
 
+    @invalidates("devicegroups")
     def add_devicegroups(  # pylint: disable=R0913
         self,
         name: str,
@@ -53,13 +66,14 @@ class DeviceGroups(LibreNMS):
         elif group_type == "dynamic":
             data.update({"rules": rules})
 
-        return post(
+        return self._post(
             self.url,
             json=data,
             headers=self.headers,
             verify=self.verify,
         )
 
+    @invalidates("devicegroups")
     def delete_devicegroup(self, name: str):
         """
         Deletes a device group.
@@ -67,12 +81,13 @@ class DeviceGroups(LibreNMS):
         :param name: name of the device group which can be obtained using get_devicegroups.
         Please ensure that the name is urlencoded if it needs to be (i.e. Linux Servers would need to be urlencoded.)
         """
-        return delete(
+        return self._delete(
             f"{self.url}/{name}",
             headers=self.headers,
             verify=self.verify,
         )
 
+    @invalidates("devicegroups")
     def update_devicegroups(  # pylint: disable=R0913
         self,
         name: str,
@@ -107,7 +122,7 @@ class DeviceGroups(LibreNMS):
         if rules:
             data.update({"rules": rules})
 
-        return patch(
+        return self._patch(
             f"{self.url}/{name}",
             json=data,
             headers=self.headers,
@@ -121,7 +136,7 @@ class DeviceGroups(LibreNMS):
         :param name: name of the device group which can be obtained using get_devicegroups.
         Please ensure that the name is urlencoded if it needs to be (i.e. Linux Servers would need to be urlencoded.)
         """
-        return get(
+        return self._get(
             f"{self.url}/{name}",
             headers=self.headers,
             verify=self.verify,
@@ -140,7 +155,7 @@ class DeviceGroups(LibreNMS):
         :param devices: A list of devices to be added to the group.
         """
         parameters = {"devices": devices}
-        return post(
+        return self._post(
             f"{self.url}/{name}/devices",
             json=parameters,
             headers=self.headers,
@@ -160,9 +175,57 @@ class DeviceGroups(LibreNMS):
         :param devices: A list of devices to be removed from the group.
         """
         parameters = {"devices": devices}
-        return delete(
+        return self._delete(
             f"{self.url}/{name}/devices",
             json=parameters,
             headers=self.headers,
             verify=self.verify
         )
+
+    def get_group_members(self, name: str):
+        """
+        Return the set of device IDs in a device group.
+        A group without any device is reported by the API as not found, and returns an empty set.
+
+        :param name: name of the device group which can be obtained using get_devicegroups.
+        Please ensure that the name is urlencoded if it needs to be (i.e. Linux Servers would need to be urlencoded.)
+        """
+        response = self.get_devices_by_group(name)
+        if response.status_code == 404:
+            return set()
+        response.raise_for_status()
+        return {device["device_id"] for device in response.json().get("devices") or []}
+
+    def sync_group(self, name: str, devices, dry_run: bool = False):
+        """
+        Make the members of a static device group exactly the given devices.
+        The current members are read once, and at most one add and one remove call are sent with the differences.
+
+        :param name: name of the device group which can be obtained using get_devicegroups.
+        :param devices: Device IDs that should be in the group
+        :param dry_run: Only compute the changes, without sending them
+        """
+        current = self.get_group_members(name)
+        desired = {int(device) for device in devices}
+        added, removed = sorted(desired - current), sorted(current - desired)
+        if not dry_run:
+            for change, call in ((added, self.add_devices_to_group), (removed, self.del_devices_from_group)):
+                if change:
+                    call(name, change).raise_for_status()
+        return GroupSync(name, added, removed)
+
+    def sync_groups(self, membership: dict, max_workers: int = 8, dry_run: bool = False):
+        """
+        Synchronise the members of many static device groups in parallel, see sync_group.
+        Yields a BulkResult per group as it completes, whose result is a GroupSync of the changes made.
+        When nothing changed this costs one read per group and no writes.
+
+        :param membership: Mapping of device group name to the device IDs that should be in it
+        :param max_workers: Maximum number of groups synchronised at once
+        :param dry_run: Only compute the changes, without sending them
+        """
+        return bulk(
+            lambda name: self.sync_group(name, membership[name], dry_run),
+            membership,
+            max_workers,
+        )
@@ -1,24 +1,32 @@
 """Includes all the methods available to the Devices endpoint."""
-from requests import delete, get, patch, post, put
-
 from librenms_handler import LibreNMS
+from librenms_handler.bulk import bulk
+from librenms_handler.cache import cached, invalidates
+from librenms_handler.columnar import BACKENDS, port_columns
+from librenms_handler.graphs import export_graphs
+from librenms_handler.models import Device, Port
+from librenms_handler.onboarding import import_devices, read_rows
+from librenms_handler.oxidized import fetch_configs
+from librenms_handler.sensors import crawl_sensors
+from librenms_handler.streaming import iter_json_array
 
 
 class Devices(LibreNMS):  # pylint: disable=R0904
     """Includes all the methods available to the Devices endpoint."""
 
-    def __init__(self, url=None, token=None, verify=True):
-        super().__init__(url, token, verify)
+    def __init__(self, url=None, token=None, verify=True, **kwargs):
+        super().__init__(url, token, verify, **kwargs)
         self.base_url = self.url
         self.url = f"{self.url}/api/v0/devices"
 
+    @invalidates("devicegroups", "sensors", "vlans")
     def del_device(self, device: str):
         """
         Delete a given device.
 
         :param device: Can be either the device hostname or ID
         """
-        return delete(f"{self.url}/{device}", headers=self.headers, verify=self.verify)
+        return self._delete(f"{self.url}/{device}", headers=self.headers, verify=self.verify)
 
     def get_device(self, device: str):
         """
@@ -26,7 +34,7 @@ class Devices(LibreNMS):  # pylint: disable=R0904
 
         :param device: Can be either the device hostname or ID
         """
-        return get(f"{self.url}/{device}", headers=self.headers, verify=self.verify)
+        return self._get(f"{self.url}/{device}", headers=self.headers, verify=self.verify)
 
     def discover_device(self, device: str):
         """
@@ -34,7 +42,7 @@ class Devices(LibreNMS):  # pylint: disable=R0904
 
         :param device: Can be either the device hostname or ID
         """
-        return get(
+        return self._get(
             f"{self.url}/{device}/discover", headers=self.headers, verify=self.verify
         )
 
@@ -44,7 +52,7 @@ class Devices(LibreNMS):  # pylint: disable=R0904
 
         :param device: Can be either the device hostname or ID
         """
-        return get(
+        return self._get(
             f"{self.url}/{device}/availability",
             headers=self.headers,
             verify=self.verify,
@@ -56,7 +64,7 @@ class Devices(LibreNMS):  # pylint: disable=R0904
 
         :param device: Can be either the device hostname or ID
         """
-        return get(
+        return self._get(
             f"{self.url}/{device}/outages", headers=self.headers, verify=self.verify
         )
 
@@ -66,7 +74,7 @@ class Devices(LibreNMS):  # pylint: disable=R0904
 
         :param device:  Can be either the device hostname or ID
         """
-        return get(
+        return self._get(
             f"{self.url}/{device}/graphs", headers=self.headers, verify=self.verify
         )
 
@@ -85,17 +93,17 @@ class Devices(LibreNMS):  # pylint: disable=R0904
         """
         if health_type:
             if sensor_id:
-                return get(
+                return self._get(
                     f"{self.url}/{device}/health/{health_type}/{sensor_id}",
                     headers=self.headers,
                     verify=self.verify,
                 )
-            return get(
+            return self._get(
                 f"{self.url}/{device}/health/{health_type}",
                 headers=self.headers,
                 verify=self.verify,
             )
-        return get(
+        return self._get(
             f"{self.url}/{device}/health", headers=self.headers, verify=self.verify
         )
 
@@ -114,23 +122,23 @@ class Devices(LibreNMS):  # pylint: disable=R0904
         """
         if wireless_type:
             if sensor_id:
-                return get(
+                return self._get(
                     f"{self.url}/{device}/wireless/{wireless_type}/{sensor_id}",
                     headers=self.headers,
                     verify=self.verify,
                 )
-            return get(
+            return self._get(
                 f"{self.url}/{device}/wireless/{wireless_type}",
                 headers=self.headers,
                 verify=self.verify,
             )
-        return get(
+        return self._get(
             f"{self.url}/{device}/wireless",
             headers=self.headers,
             verify=self.verify,
         )
 
-    def get_health_graph(self, device: str, health_type: str, sensor_id: int = None):
+    def get_health_graph(self, device: str, health_type: str, sensor_id: int = None, stream: bool = False):
         """
         Get a particular health class graph for a device.
         If you provide a sensor_id as well then a single sensor graph will be provided.
@@ -139,20 +147,23 @@ class Devices(LibreNMS):  # pylint: disable=R0904
         :param device: Can be either device hostname or ID
         :param health_type: Health graph as returned by list_available_health_graphs()
         :param sensor_id: Optional sensor ID graph to return from health graph
+        :param stream: Leave the body unread so it can be written out in chunks, see export_graphs.
         """
         if sensor_id:
-            return get(
+            return self._get(
                 f"{self.url}/{device}/graphs/health/{health_type}/{sensor_id}",
                 headers=self.headers,
                 verify=self.verify,
+                stream=stream,
             )
-        return get(
+        return self._get(
             f"{self.url}/{device}/graphs/health/{health_type}",
             headers=self.headers,
             verify=self.verify,
+            stream=stream,
         )
 
-    def get_wireless_graph(self, device: str, graph_type: str, senor_id: int = None):
+    def get_wireless_graph(self, device: str, graph_type: str, senor_id: int = None, stream: bool = False):
         """
         Get a particular wireless class graph for a device.
         If you provide a sensor_id as well then a single sensor graph will be provided.
@@ -161,17 +172,20 @@ class Devices(LibreNMS):  # pylint: disable=R0904
         :param device: Can be either device hostname or ID
         :param graph_type: Name of wireless graph as returned by list_available_wireless_graphs()
         :param senor_id: Optional sensor ID graph to return from wireless sensor graph
+        :param stream: Leave the body unread so it can be written out in chunks, see export_graphs.
         """
         if senor_id:
-            return get(
-                f"{self.url}/{device}/graphs/wireless/{graph_type}",
+            return self._get(
+                f"{self.url}/{device}/graphs/wireless/{graph_type}/{senor_id}",
                 headers=self.headers,
                 verify=self.verify,
+                stream=stream,
             )
-        return get(
-            f"{self.url}/{device}/graphs/wireless/{graph_type}/{senor_id}",
+        return self._get(
+            f"{self.url}/{device}/graphs/wireless/{graph_type}",
             headers=self.headers,
             verify=self.verify,
+            stream=stream,
         )
 
     def get_graph_generic_by_hostname(  # pylint: disable=R0913
@@ -183,6 +197,7 @@ class Devices(LibreNMS):  # pylint: disable=R0904
         width: int = None,
         height: int = None,
         output: str = None,
+        stream: bool = False,
     ):
         """
         Get a specific graph for a device, this does not include ports.
@@ -194,6 +209,7 @@ class Devices(LibreNMS):  # pylint: disable=R0904
         :param width: graph width, defaults to 1075.
         :param height: graph height, defaults to 300.
         :param output: how the graph should be outputted (base64, display), defaults to display.
+        :param stream: Leave the body unread so it can be written out in chunks, see export_graphs.
         """
         parameters = dict(
             {
@@ -204,35 +220,61 @@ class Devices(LibreNMS):  # pylint: disable=R0904
                 "output": output,
             }
         )
-        return get(
+        return self._get(
             f"{self.url}/{device}/{graph_type}",
             parameters,
             headers=self.headers,
             verify=self.verify,
+            stream=stream,
         )
 
-    def get_port_graphs(self, device: str, columns: str = None):
+    def get_port_graphs(self, device: str, columns: str = None, stream: bool = False):
         """
         Get a list of ports for a particular device.
 
         :param device: Can be either the device hostname or ID
         :param columns: Comma separated list of columns you want returned.
+        :param stream: Leave the body unread so it can be decoded incrementally, see get_port_columns.
         """
         parameters = dict({"columns": columns})
-        return get(
+        return self._get(
             f"{self.url}/{device}/ports",
             parameters,
             headers=self.headers,
             verify=self.verify,
+            stream=stream,
         )
 
+    def get_port_columns(self, device: str, columns: str, backend: str = "array"):
+        """
+        Get the ports of a particular device as one contiguous column per field, see librenms_handler.columnar.
+        Numeric columns (ifInOctets_rate, ifOutErrors, ifSpeed, ...) are typed arrays of doubles.
+
+        :param device: Can be either the device hostname or ID
+        :param columns: Comma separated list of columns you want returned.
+        :param backend: "array" for a dict of array.array, "numpy" for numpy arrays or "arrow" for a pyarrow.Table
+        """
+        ports = iter_json_array(self.get_port_graphs(device, columns, stream=True), "ports")
+        return BACKENDS[backend](port_columns(ports, columns))
+
+    def port_records(self, device: str, columns: str = None):
+        """
+        Get the ports of a particular device as compact Port records.
+
+        :param device: Can be either the device hostname or ID
+        :param columns: Comma separated list of columns you want returned, the others are left as None.
+        """
+        response = self.get_port_graphs(device, columns)
+        response.raise_for_status()
+        return list(Port.from_items(response.json().get("ports") or []))
+
     def get_device_fdb(self, device: str):
         """
         Get a list of FDB entries associated with a device.
 
         :param device: Can be either the device hostname or ID
         """
-        return get(f"{self.url}/{device}/fdb", headers=self.headers, verify=self.verify)
+        return self._get(f"{self.url}/{device}/fdb", headers=self.headers, verify=self.verify)
 
     def get_device_ip_addresses(self, device: str):
         """
@@ -240,7 +282,7 @@ class Devices(LibreNMS):  # pylint: disable=R0904
 
         :param device: Can be either the device hostname or ID
         """
-        return get(f"{self.url}/{device}/ip", headers=self.headers, verify=self.verify)
+        return self._get(f"{self.url}/{device}/ip", headers=self.headers, verify=self.verify)
 
     def get_port_stack(self, device: str):
         """
@@ -249,7 +291,7 @@ class Devices(LibreNMS):  # pylint: disable=R0904
 
         :param device: Can be either the device hostname or ID
         """
-        return get(
+        return self._get(
             f"{self.url}/{device}/port_stack", headers=self.headers, verify=self.verify
         )
 
@@ -284,7 +326,7 @@ class Devices(LibreNMS):  # pylint: disable=R0904
                 "ignore": ignore,
             }
         )
-        return get(
+        return self._get(
             f"{self.url}/{device}/components",
             parameters,
             headers=self.headers,
@@ -298,7 +340,7 @@ class Devices(LibreNMS):  # pylint: disable=R0904
         :param device: Can be either the device hostname or ID
         :param component_type: Type of component to add
         """
-        return post(
+        return self._post(
             f"{self.url}/{device}/components/{component_type}",
             headers=self.headers,
             verify=self.verify,
@@ -339,7 +381,7 @@ class Devices(LibreNMS):  # pylint: disable=R0904
                 }
             }
         )
-        return put(
+        return self._put(
             f"{self.url}/{device}/components",
             data,
             headers=self.headers,
@@ -353,7 +395,7 @@ class Devices(LibreNMS):  # pylint: disable=R0904
         :param device: Can be either the device hostname or ID
         :param component: Component ID to be deleted
         """
-        return delete(
+        return self._delete(
             f"{self.url}/{device}/components/{component}",
             headers=self.headers,
             verify=self.verify,
@@ -372,13 +414,48 @@ class Devices(LibreNMS):  # pylint: disable=R0904
         """
         parameters = dict({"columns": columns})
         interface_name = interface_name.replace('/', '%2F')
-        return get(
+        return self._get(
             f"{self.url}/{device}/ports/{interface_name}",
             parameters,
             headers=self.headers,
             verify=self.verify,
         )
 
+    def get_port_stats_columns(  # pylint: disable=R0913
+        self,
+        device: str,
+        interface_names,
+        columns: str,
+        backend: str = "array",
+        max_workers: int = 8,
+    ):
+        """
+        Get information about many ports of a device as one contiguous column per field, see get_port_columns.
+        The ports are requested concurrently with get_port_stats_by_port_hostname,
+        and a LookupError is raised if one of them is not returned.
+
+        :param device: Can be either the device hostname or ID
+        :param interface_names: Interface names of the ports, as obtained using get_port_graphs
+        :param columns: Comma separated list of columns you want returned
+        :param backend: "array" for a dict of array.array, "numpy" for numpy arrays or "arrow" for a pyarrow.Table
+        :param max_workers: Maximum number of requests in flight at once
+        """
+        interface_names = list(interface_names)
+        ports = {}
+        for result in bulk(
+            lambda name: self.get_port_stats_by_port_hostname(device, name, columns),
+            interface_names,
+            max_workers,
+        ):
+            if result.error:
+                raise result.error
+            result.result.raise_for_status()
+            port = result.result.json().get("port")
+            if not port:
+                raise LookupError(f"No port {result.item} was returned for {device}")
+            ports[result.item] = port if isinstance(port, list) else [port]
+        return BACKENDS[backend](port_columns((port for name in interface_names for port in ports[name]), columns))
+
     def get_graph_by_port_hostname(  # pylint: disable=R0913
         self,
         device: str,
@@ -389,6 +466,7 @@ class Devices(LibreNMS):  # pylint: disable=R0904
         width: int = None,
         height: int = None,
         interface_description: bool = None,
+        stream: bool = False,
     ):
         """
         Get a graph of a port for a particular device.
@@ -404,6 +482,7 @@ class Devices(LibreNMS):  # pylint: disable=R0904
         :param height: graph height, defaults to 300.
         :param interface_description: Will use ifDescr to lookup the port instead of ifName when true.
         Pass the ifDescr value you want to search as you would ifName.
+        :param stream: Leave the body unread so it can be written out in chunks, see export_graphs.
         """
         parameters = dict(
             {
@@ -415,31 +494,64 @@ class Devices(LibreNMS):  # pylint: disable=R0904
             }
         )
         interface_name = interface_name.replace('/', '%2F')
-        return get(
+        return self._get(
             f"{self.url}/{device}/ports/{interface_name}/{port_type}",
             parameters,
             headers=self.headers,
             verify=self.verify,
+            stream=stream,
         )
 
+    def export_graphs(  # pylint: disable=R0913
+        self,
+        specs,
+        directory: str,
+        max_workers: int = 8,
+        max_age: float = None,
+        base64: bool = False,
+    ):
+        """
+        Download many graphs concurrently, streaming each one to a file in directory.
+        Files already present and younger than max_age are skipped.
+        Yields a BulkResult per spec as it completes, see librenms_handler.graphs.export_graphs.
+
+        :param specs: Iterable of librenms_handler.graphs.GraphSpec
+        :param directory: Directory the graphs are saved in, created if missing
+        :param max_workers: Maximum number of downloads running at once
+        :param max_age: Seconds an existing file stays up to date for, None to keep existing files forever
+        :param base64: Request device graphs with output=base64 and decode the body while it is written
+        """
+        return export_graphs(self, specs, directory, max_workers, max_age, base64)
+
+    @cached("locations")
     def list_locations(self):
         """Return a list of locations."""
-        return get(
+        return self._get(
             f"{self.base_url}/api/v0/resources/locations",
             headers=self.headers,
             verify=self.verify,
         )
 
-    def list_sensors(self):
-        """Get a list of all Sensors."""
-        return get(
+    @cached("sensors")
+    def list_sensors(self, stream: bool = False):
+        """
+        Get a list of all Sensors.
+
+        :param stream: Leave the body unread so it can be decoded incrementally, see iter_sensors.
+        """
+        return self._get(
             f"{self.base_url}/api/v0/resources/sensors",
             headers=self.headers,
             verify=self.verify,
+            stream=stream,
         )
 
+    def iter_sensors(self):
+        """Iterate over all Sensors one at a time, decoding the response as it is read."""
+        return iter_json_array(self.list_sensors(stream=True), "sensors")
+
     def list_devices(
-        self, order: str = None, order_type: str = None, query: str = None
+        self, order: str = None, order_type: str = None, query: str = None, stream: bool = False
     ):
         """
         Return a list of devices.
@@ -462,9 +574,32 @@ class Devices(LibreNMS):  # pylint: disable=R0904
         :param order: Orders output. Defaults 'hostname'. Can be prepended by DESC or ASC to change the order
         :param order_type: Filter or search by one of the parameters shown above
         :param query: If searching by, then this will be used as the input
+        :param stream: Leave the body unread so it can be decoded incrementally, see iter_devices.
         """
         parameters = dict({"order": order, "type": order_type, "query": query})
-        return get(self.url, parameters, headers=self.headers, verify=self.verify)
+        return self._get(self.url, parameters, headers=self.headers, verify=self.verify, stream=stream)
+
+    def iter_devices(self, order: str = None, order_type: str = None, query: str = None):
+        """
+        Iterate over the devices one at a time, decoding the response as it is read.
+        Takes the same parameters as list_devices.
+
+        :param order: Orders output. Defaults 'hostname'. Can be prepended by DESC or ASC to change the order
+        :param order_type: Filter or search by one of the parameters shown in list_devices
+        :param query: If searching by, then this will be used as the input
+        """
+        return iter_json_array(self.list_devices(order, order_type, query, stream=True), "devices")
+
+    def device_records(self, order: str = None, order_type: str = None, query: str = None):
+        """
+        Iterate over the devices as compact Device records, decoding the response as it is read.
+        Takes the same parameters as list_devices.
+
+        :param order: Orders output. Defaults 'hostname'. Can be prepended by DESC or ASC to change the order
+        :param order_type: Filter or search by one of the parameters shown in list_devices
+        :param query: If searching by, then this will be used as the input
+        """
+        return Device.from_items(self.iter_devices(order, order_type, query))
 
     def add_device(  # pylint: disable=C0103, R0913, R0914
         self,
@@ -528,7 +663,21 @@ class Devices(LibreNMS):  # pylint: disable=R0904
                 "hardware": hardware,
             }
         )
-        return post(self.url, json=data, headers=self.headers, verify=self.verify)
+        return self._post(self.url, json=data, headers=self.headers, verify=self.verify)
+
+    def import_devices(self, rows, journal: str = None, max_workers: int = 4, rate: float = None):
+        """
+        Add many devices concurrently, skipping those LibreNMS already has, and yield an ImportResult per row.
+        See librenms_handler.onboarding.import_devices.
+
+        :param rows: Iterable of mappings of add_device parameters, or the path of a CSV or YAML file holding them
+        :param journal: Path of the file completed hostnames are recorded in, so an interrupted import can be resumed
+        :param max_workers: Maximum number of add_device calls running at once
+        :param rate: Maximum add_device calls per second, None for no limit
+        """
+        if isinstance(rows, str):
+            rows = read_rows(rows)
+        return import_devices(self, rows, journal, max_workers, rate)
 
     def list_oxidized(self, device: str = None):
         """
@@ -538,12 +687,12 @@ class Devices(LibreNMS):  # pylint: disable=R0904
         :param device: Can be either the device hostname or ID
         """
         if device:
-            return get(
+            return self._get(
                 f"{self.base_url}/api/v0/oxidized/{device}",
                 headers=self.headers,
                 verify=self.verify,
             )
-        return get(
+        return self._get(
             f"{self.base_url}/api/v0/oxidized",
             headers=self.headers,
             verify=self.verify,
@@ -563,13 +712,14 @@ class Devices(LibreNMS):  # pylint: disable=R0904
                 "data": data,
             }
         )
-        return patch(
+        return self._patch(
             f"{self.url}/{device}",
             json=data,
             headers=self.headers,
             verify=self.verify,
         )
 
+    @invalidates("devicegroups", "sensors", "vlans")
     def rename_device(self, device: str, new_hostname: str):
         """
         Rename device.
@@ -577,7 +727,7 @@ class Devices(LibreNMS):  # pylint: disable=R0904
         :param device: Can be either the device hostname or ID
         :param new_hostname: New hostname for the device
         """
-        return patch(
+        return self._patch(
             f"{self.url}/{device}/rename/{new_hostname}",
             headers=self.headers,
             verify=self.verify,
@@ -589,7 +739,7 @@ class Devices(LibreNMS):  # pylint: disable=R0904
 
         :param device: Can be either the device hostname or ID
         """
-        return get(
+        return self._get(
             f"{self.url}/{device}/groups",
             headers=self.headers,
             verify=self.verify,
@@ -601,7 +751,7 @@ class Devices(LibreNMS):  # pylint: disable=R0904
 
         :param search_string: The Specific string you would like to search for
         """
-        return get(
+        return self._get(
             f"{self.base_url}/api/v0/oxidized/config/search/{search_string}",
             headers=self.headers,
             verify=self.verify,
@@ -613,12 +763,47 @@ class Devices(LibreNMS):  # pylint: disable=R0904
 
         :param device_name: The full DNS name of the device used when adding the device to LibreNMS
         """
-        return get(
+        return self._get(
             f"{self.base_url}/api/v0/oxidized/config/{device_name}",
             headers=self.headers,
             verify=self.verify,
         )
 
+    def fetch_oxidized_configs(self, store, max_workers: int = 8, hostnames=None):
+        """
+        Fetch the Oxidized config of every device concurrently, yielding a BulkResult only for the configs that changed
+        since the last run and for the fetches that failed, see librenms_handler.oxidized.fetch_configs.
+        Configs are kept in a content-addressed store, so unchanged and identical configs are stored once.
+
+        :param store: librenms_handler.oxidized.ConfigStore, or the directory of one
+        :param max_workers: Maximum number of configs fetched at once
+        :param hostnames: Hostnames to fetch the config of, every device listed by list_oxidized if not given
+        """
+        return fetch_configs(self, store, max_workers, hostnames)
+
+    def crawl_sensors(  # pylint: disable=R0913
+        self,
+        catalog,
+        hostnames=None,
+        max_workers: int = 8,
+        wireless: bool = True,
+        sensor_list: bool = True,
+        details: bool = False,
+    ):
+        """
+        Crawl the health and wireless sensors of every device, or of some of them, concurrently into a catalog
+        indexed by device, graph type and sensor ID, yielding a BulkResult per device,
+        see librenms_handler.sensors.crawl_sensors.
+
+        :param catalog: librenms_handler.sensors.SensorCatalog, or the path of one
+        :param hostnames: Devices to crawl, every device listed by list_devices if not given
+        :param max_workers: Maximum number of devices crawled at once
+        :param wireless: Whether to crawl the wireless sensors as well
+        :param sensor_list: Find the health sensors of every device with one list_sensors call
+        :param details: Fetch every walked sensor on its own, for its full record
+        """
+        return crawl_sensors(self, catalog, hostnames, max_workers, wireless, sensor_list, details)
+
     def add_parents_to_host(self, device: str, parent_ids):
         """
         Add one or more parents to host.
@@ -631,7 +816,7 @@ class Devices(LibreNMS):  # pylint: disable=R0904
                 "parent_ids": parent_ids,
             }
         )
-        return post(
+        return self._post(
             f"{self.url}/{device}/parents",
             json=data,
             headers=self.headers,
@@ -651,7 +836,7 @@ class Devices(LibreNMS):  # pylint: disable=R0904
                 "parent_ids": parent_ids,
             }
         )
-        return delete(
+        return self._delete(
             f"{self.url}/{device}/parents",
             data=data,
             headers=self.headers,
@@ -672,7 +857,7 @@ class Devices(LibreNMS):  # pylint: disable=R0904
                 "duration": duration
             }
         )
-        return post(
+        return self._post(
             f"{self.url}/{device}/maintenance",
             json=data,
             headers=self.headers,
@@ -0,0 +1,27 @@
+"""Writes files atomically, so readers never see a partial file and concurrent writers never share one."""
+import os
+import tempfile
+from contextlib import contextmanager, suppress
+
+
+@contextmanager
+def atomic_write(path: str, mode: str = "wb", permissions: int = 0o644, encoding: str = None):
+    """
+    Open a temporary file of its own next to path for writing, which replaces path once the block exits.
+    If the block raises, the temporary file is removed and path is left untouched.
+
+    :param path: Path of the file to write
+    :param mode: Mode the temporary file is opened in, "wb" or "w"
+    :param permissions: Permissions of the file, 0o600 for files only their owner should read
+    :param encoding: Encoding of a file opened in text mode
+    """
+    descriptor, temporary = tempfile.mkstemp(suffix=".part", dir=os.path.dirname(path) or None)
+    try:
+        with os.fdopen(descriptor, mode, encoding=encoding) as file:
+            os.chmod(temporary, permissions)
+            yield file
+        os.replace(temporary, path)
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.remove(temporary)
+        raise
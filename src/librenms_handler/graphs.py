@@ -0,0 +1,245 @@
+"""Downloads many graphs concurrently, streaming each one straight to disk."""
+import binascii
+import os
+import re
+from collections import namedtuple
+from time import time
+from urllib.parse import quote
+
+from librenms_handler.bulk import bulk
+from librenms_handler.files import atomic_write
+
+GraphSpec = namedtuple(
+    "GraphSpec",
+    ["device", "graph_type", "port", "sensor_id", "date_from", "date_to", "kind", "filename"],
+    defaults=(None, None, None, None, None, None),
+)
+GraphSpec.__doc__ = """
+One graph to export with export_graphs().
+
+:param device: Can be either the device hostname or ID
+:param graph_type: Device graph type (get_graphs), port graph type (get_port_graphs), health type or wireless type
+:param port: Interface name of the port, for port graphs
+:param sensor_id: Sensor ID, for health and wireless graphs
+:param date_from: date you would like the graph to start, ignored by health and wireless graphs
+:param date_to: date you would like the graph to end, ignored by health and wireless graphs
+:param kind: "device", "port", "health" or "wireless", defaults to "port" when port is set and "device" otherwise
+:param filename: Name of the file within the export directory, derived from the other fields if not given
+"""
+
+# Fields naming the graphs of each kind, in the order they appear in the file name
+_NAME_FIELDS = {
+    "device": ("device", "graph_type", "date_from", "date_to"),
+    "port": ("device", "port", "graph_type", "date_from", "date_to"),
+    "health": ("device", "graph_type", "sensor_id"),
+    "wireless": ("device", "graph_type", "sensor_id"),
+}
+
+
+def _escape(part):
+    """Percent-encode a part of a file name, underscores included as they separate the parts."""
+    return quote(str(part), safe="").replace("_", "%5F") if part is not None else ""
+
+
+def graph_filename(spec: GraphSpec):
+    """
+    Return the file name a graph is saved under: its kind followed by the fields naming it, each percent-encoded
+    with its underscores so that two different graphs never share a file, e.g. port_sw1_Gi1%2F0%2F1_port%5Fbits.png.
+    """
+    if spec.filename:
+        return spec.filename
+    kind = _kind(spec)
+    parts = [getattr(spec, field) for field in _NAME_FIELDS.get(kind, _NAME_FIELDS["device"])]
+    while parts and parts[-1] is None:
+        parts.pop()
+    return "_".join([_escape(kind)] + [_escape(part) for part in parts]) + ".png"
+
+
+class ImageField:
+    """
+    Extracts the base64 image from a body chunk by chunk, the way output=base64 graphs are returned:
+    inside the JSON envelope of the API, {"status": "ok", "image": "data:image/png;base64,..."}, with escaped slashes.
+    A body that is not a JSON object is passed through unchanged, as bare base64.
+    """
+
+    _KEY = re.compile(rb'"image"\s*:\s*"')
+    _ESCAPES = {b"/": b"/", b"\\": b"\\", b'"': b'"', b"n": b"", b"r": b"", b"t": b""}
+
+    def __init__(self):
+        self._buffer = b""
+        self._state = None
+
+    def feed(self, chunk: bytes):
+        """Return the characters of the image found in chunk, unescaped."""
+        data = self._buffer + chunk
+        self._buffer = b""
+        if self._state is None:
+            stripped = data.lstrip()
+            if not stripped:
+                return b""
+            self._state = "key" if stripped.startswith(b"{") else "bare"
+        if self._state == "bare":
+            return data
+        if self._state == "key":
+            match = self._KEY.search(data)
+            if match is None:
+                # Keep the end of the data, in case the key is split between two chunks
+                self._buffer = data[-32:]
+                return b""
+            self._state = "value"
+            data = data[match.end() :]
+        if self._state == "value":
+            return self._value(data)
+        return b""
+
+    def _value(self, data: bytes):
+        """Return the characters of the string value in data up to its closing quote, unescaping them."""
+        output = []
+        position = 0
+        while True:
+            special = min(
+                (index for index in (data.find(b"\\", position), data.find(b'"', position)) if index >= 0), default=-1
+            )
+            if special < 0:
+                output.append(data[position:])
+                break
+            output.append(data[position:special])
+            if data[special : special + 1] == b'"':
+                self._state = "done"
+                break
+            if special + 1 >= len(data):
+                self._buffer = data[special:]
+                break
+            escaped = data[special + 1 : special + 2]
+            if escaped not in self._ESCAPES:
+                raise ValueError(f"Unexpected escape \\{escaped.decode(errors='replace')} in a base64 image")
+            output.append(self._ESCAPES[escaped])
+            position = special + 2
+        return b"".join(output)
+
+    def close(self):
+        """Check that the whole image was found once the body has been fully read."""
+        if self._state in ("key", "value"):
+            raise ValueError("The response holds no complete base64 image")
+
+
+class Base64Decoder:
+    """Decodes a base64 body chunk by chunk, skipping a leading data URI header and whitespace."""
+
+    def __init__(self):
+        self._pending = b""
+        self._started = False
+
+    def decode(self, chunk: bytes):
+        """Return the bytes decoded from chunk, keeping back any trailing partial group of four characters."""
+        data = self._pending + b"".join(chunk.split())
+        if not self._started:
+            # Wait for the whole header, which may be split between chunks down to its first characters
+            if (data.startswith(b"data:") or b"data:".startswith(data)) and b"," not in data:
+                self._pending = data
+                return b""
+            if data.startswith(b"data:"):
+                data = data.split(b",", 1)[1]
+            self._started = True
+        usable = len(data) - len(data) % 4
+        self._pending = data[usable:]
+        return binascii.a2b_base64(data[:usable]) if usable else b""
+
+    def flush(self):
+        """Return whatever is left once the body has been fully read."""
+        data, self._pending = self._pending, b""
+        return binascii.a2b_base64(data + b"=" * (-len(data) % 4)) if data else b""
+
+
+def _kind(spec: GraphSpec):
+    """Return the kind of graph spec describes, inferring it from port when not given."""
+    return spec.kind or ("port" if spec.port else "device")
+
+
+def _request_graph(devices, spec: GraphSpec, base64: bool):
+    """Request the body of one graph with stream=True using the matching Devices method."""
+    kind = _kind(spec)
+    if kind == "port":
+        return devices.get_graph_by_port_hostname(
+            spec.device, spec.port, spec.graph_type, spec.date_from, spec.date_to, stream=True
+        )
+    if kind == "health":
+        return devices.get_health_graph(spec.device, spec.graph_type, spec.sensor_id, stream=True)
+    if kind == "wireless":
+        return devices.get_wireless_graph(spec.device, spec.graph_type, spec.sensor_id, stream=True)
+    return devices.get_graph_generic_by_hostname(
+        spec.device,
+        spec.graph_type,
+        spec.date_from,
+        spec.date_to,
+        output="base64" if base64 else None,
+        stream=True,
+    )
+
+
+def download_graph(  # pylint: disable=R0913
+    devices,
+    spec: GraphSpec,
+    directory: str,
+    max_age: float = None,
+    base64: bool = False,
+    chunk_size: int = 65536,
+):
+    """
+    Download one graph into directory, writing it chunk by chunk to a temporary file that replaces the target once done.
+    Returns a tuple of the path and whether the graph was downloaded, False meaning the existing file was kept.
+
+    :param devices: Devices endpoint to request the graph with
+    :param spec: Graph to download
+    :param directory: Directory the graph is saved in
+    :param max_age: Seconds an existing non-empty file stays up to date for, None to keep existing files forever
+    :param base64: Request device graphs with output=base64 and decode the body while it is written
+    :param chunk_size: Number of bytes read from the body at a time
+    """
+    path = os.path.join(directory, graph_filename(spec))
+    try:
+        status = os.stat(path)
+        if status.st_size and (max_age is None or time() - status.st_mtime < max_age):
+            return path, False
+    except FileNotFoundError:
+        pass
+    decoder = Base64Decoder() if base64 and _kind(spec) == "device" else None
+    field = ImageField() if decoder else None
+    with _request_graph(devices, spec, base64) as response:
+        response.raise_for_status()
+        with atomic_write(path) as file:
+            for chunk in response.iter_content(chunk_size):
+                file.write(decoder.decode(field.feed(chunk)) if decoder else chunk)
+            if decoder:
+                field.close()
+                file.write(decoder.flush())
+    return path, True
+
+
+def export_graphs(  # pylint: disable=R0913
+    devices,
+    specs,
+    directory: str,
+    max_workers: int = 8,
+    max_age: float = None,
+    base64: bool = False,
+    chunk_size: int = 65536,
+):
+    """
+    Download many graphs concurrently, yielding a BulkResult per GraphSpec as it completes.
+    The result of each is the tuple returned by download_graph, and a failed download is reported in its error.
+
+    :param devices: Devices endpoint to request the graphs with
+    :param specs: Iterable of GraphSpec
+    :param directory: Directory the graphs are saved in, created if missing
+    :param max_workers: Maximum number of downloads running at once
+    :param max_age: Seconds an existing non-empty file stays up to date for, None to keep existing files forever
+    :param base64: Request device graphs with output=base64 and decode the body while it is written
+    :param chunk_size: Number of bytes read from each body at a time
+    """
+    os.makedirs(directory, exist_ok=True)
+    return bulk(
+        lambda spec: download_graph(devices, spec, directory, max_age, base64, chunk_size),
+        specs,
+        max_workers,
+    )
@@ -0,0 +1,213 @@
+"""Optional HTTP/2 transport, multiplexing concurrent requests over a few connections."""
+try:
+    import httpx
+except ImportError as error:  # pragma: no cover
+    raise ImportError(
+        "The HTTP/2 transport requires httpx with HTTP/2 support, install it with `pip install librenms-handler[http2]`"
+    ) from error
+
+import asyncio
+from threading import Lock, Thread
+
+from requests import Session
+from requests.adapters import BaseAdapter
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from requests.exceptions import ConnectTimeout, ReadTimeout
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# Connection-specific headers set by requests for HTTP/1.1, which are not allowed in HTTP/2
+_HOP_BY_HOP = {"connection", "keep-alive", "proxy-connection", "transfer-encoding", "upgrade"}
+
+
+def _timeout(timeout):
+    """Convert a requests timeout, a number or a (connect, read) tuple, to an httpx.Timeout."""
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return httpx.Timeout(None, connect=connect, read=read)
+    return httpx.Timeout(timeout)
+
+
+def _translate(error: httpx.HTTPError, request=None):
+    """Return the requests exception matching an httpx one, so that retry policies keep working."""
+    if isinstance(error, httpx.ConnectTimeout):
+        return ConnectTimeout(error, request=request)
+    if isinstance(error, httpx.TimeoutException):
+        return ReadTimeout(error, request=request)
+    return RequestsConnectionError(error, request=request)
+
+
+def _run_forever(loop):
+    """Run an event loop on the current thread until it is stopped, then close it."""
+    asyncio.set_event_loop(loop)
+    try:
+        loop.run_forever()
+    finally:
+        loop.close()
+
+
+class _Body:
+    """
+    Exposes the body of an httpx.Response the way requests reads a urllib3 response.
+    A body read in full is served from memory, a streamed one is read chunk by chunk on the event loop.
+    """
+
+    def __init__(self, response: httpx.Response, run, streamed: bool):
+        self.response = response
+        self.version = 20 if response.http_version == "HTTP/2" else 11
+        self._run = run
+        self._streamed = streamed
+        self._chunks = None
+
+    def stream(self, chunk_size: int = 65536, decode_content=True):  # pylint: disable=W0613
+        """Yield the decoded body chunk by chunk."""
+        if not self._streamed:
+            content = self.response.content
+            for start in range(0, len(content), chunk_size):
+                yield content[start : start + chunk_size]
+            return
+        chunks = self.response.aiter_bytes(chunk_size)
+        while True:
+            try:
+                # anext() is only a builtin from Python 3.10
+                yield self._run(chunks.__anext__())  # pylint: disable=C2801
+            except StopAsyncIteration:
+                return
+            except httpx.HTTPError as error:
+                raise _translate(error) from error
+
+    def read(self, amt: int = None):
+        """Return up to amt bytes of the decoded body, all of what remains if amt is None."""
+        if self._chunks is None:
+            self._chunks = self.stream(amt or 65536)
+        if amt is None:
+            return b"".join(self._chunks)
+        return next(self._chunks, b"")
+
+    def close(self):
+        """Close a streamed body that was not read to the end, releasing its stream on the connection."""
+        if self._streamed and not self.response.is_closed:
+            self._run(self.response.aclose())
+
+    def release_conn(self):
+        """Called by requests once the body was consumed, the same as close() for an httpx response."""
+        self.close()
+
+
+class HTTP2Adapter(BaseAdapter):
+    """
+    Transport adapter sending the requests of a session through httpx, speaking HTTP/2 to servers that offer it.
+    Concurrent requests to one server are multiplexed over a few connections instead of needing one connection each.
+    Servers that do not negotiate HTTP/2 are spoken to in HTTP/1.1.
+    Transport errors are raised as the matching requests exceptions, so retry policies keep working.
+
+    The connections are driven by an event loop on a background thread, which the calling threads hand their
+    requests to: the synchronous HTTP/2 client of httpx is not safe to share between threads, as two of them
+    can send their streams out of order and have the server close the connection.
+
+    :param max_connections: Maximum number of connections open at once
+    :param max_keepalive_connections: Maximum number of idle connections kept alive
+    :param http1: Whether HTTP/1.1 may be used. Set to False to speak HTTP/2 with prior knowledge,
+    required for plain http:// servers as HTTP/2 is otherwise only negotiated over TLS.
+    """
+
+    def __init__(self, max_connections: int = 10, max_keepalive_connections: int = 10, http1: bool = True):
+        super().__init__()
+        self.limits = httpx.Limits(
+            max_connections=max_connections, max_keepalive_connections=max_keepalive_connections
+        )
+        self.http1 = http1
+        self._clients = {}
+        self._loop = None
+        self._thread = None
+        self._lock = Lock()
+
+    def _run(self, coroutine):
+        """Run a coroutine on the event loop of the adapter, starting the loop on first use, and return its result."""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = Thread(target=_run_forever, args=(self._loop,), name="librenms-http2", daemon=True)
+                self._thread.start()
+            loop = self._loop
+        return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+
+    def client(self, verify=True, cert=None):
+        """
+        Return the httpx.AsyncClient requests with these TLS options are sent through, creating it on first use.
+        It must only be used from the event loop of the adapter.
+        """
+        key = (verify, cert if not isinstance(cert, list) else tuple(cert))
+        with self._lock:
+            if key not in self._clients:
+                self._clients[key] = httpx.AsyncClient(
+                    http2=True, http1=self.http1, verify=verify, cert=cert, limits=self.limits, trust_env=False
+                )
+            return self._clients[key]
+
+    def send(  # pylint: disable=R0913,W0613
+        self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None
+    ):
+        client = self.client(verify, cert)
+
+        async def exchange():
+            outgoing = client.build_request(
+                request.method,
+                request.url,
+                headers={name: value for name, value in request.headers.items() if name.lower() not in _HOP_BY_HOP},
+                content=request.body,
+                timeout=_timeout(timeout),
+            )
+            incoming = await client.send(outgoing, stream=True)
+            if not stream:
+                try:
+                    await incoming.aread()
+                finally:
+                    await incoming.aclose()
+            return incoming
+
+        try:
+            incoming = self._run(exchange())
+        except httpx.HTTPError as error:
+            raise _translate(error, request) from error
+        return self.build_response(request, incoming, self._run, stream)
+
+    @staticmethod
+    def build_response(request, incoming: httpx.Response, run, streamed: bool = False):
+        """Build a requests.Response around an httpx.Response, whose body is read through run when streamed."""
+        response = Response()
+        response.status_code = incoming.status_code
+        response.reason = incoming.reason_phrase
+        response.headers = CaseInsensitiveDict(incoming.headers.multi_items())
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = _Body(incoming, run, streamed)
+        response.url = str(incoming.url)
+        response.request = request
+        return response
+
+    def close(self):
+        with self._lock:
+            clients, self._clients = list(self._clients.values()), {}
+            loop, thread, self._loop, self._thread = self._loop, self._thread, None, None
+        if loop is None:
+            return
+        for client in clients:
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+
+
+def create_http2_session(max_connections: int = 10, max_keepalive_connections: int = 10, http1: bool = True):
+    """
+    Create a session sending its requests over HTTP/2, to pass as session= to an endpoint or a Client.
+
+    :param max_connections: Maximum number of connections open at once
+    :param max_keepalive_connections: Maximum number of idle connections kept alive
+    :param http1: Set to False to speak HTTP/2 with prior knowledge to a plain http:// server, see HTTP2Adapter
+    """
+    session = Session()
+    adapter = HTTP2Adapter(max_connections, max_keepalive_connections, http1)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
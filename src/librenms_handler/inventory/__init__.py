@@ -1,2 +1,2 @@
 """Imports all the modules that are ready for use"""
-from librenms_handler.inventory.inventory import Inventory
+from librenms_handler.inventory.inventory import Inventory, InventoryTree
@@ -1,14 +1,116 @@
 """Includes all the methods available to the Inventory endpoint."""
-from requests import get
-
 from librenms_handler import LibreNMS
+from librenms_handler.bulk import bulk
+from librenms_handler.models import InventoryItem
+
+
+def _position(item: dict):
+    """Sort key ordering sibling items by entPhysicalParentRelPos, then entPhysicalIndex."""
+    try:
+        position = int(item.get("entPhysicalParentRelPos"))
+    except (TypeError, ValueError):
+        position = -1
+    return position, item["entPhysicalIndex"]
+
+
+class InventoryTree:
+    """
+    Compact in-memory inventory of a device, indexed on entPhysicalIndex.
+
+    :param items: Mapping of entPhysicalIndex to the inventory item returned by the API
+    :param children: Mapping of entPhysicalIndex to the entPhysicalIndex of each of its children
+    :param parents: Mapping of entPhysicalIndex to the entPhysicalIndex of its parent
+    :param roots: entPhysicalIndex of every item without a known parent
+    """
+
+    __slots__ = ("items", "children", "parents", "roots")
+
+    def __init__(self):
+        self.items = {}
+        self.children = {}
+        self.parents = {}
+        self.roots = []
+
+    def add(self, item: dict):
+        """
+        Add an inventory item, linking it to its parent through entPhysicalContainedIn.
+        An item contained in itself is added as a root.
+        """
+        index = item["entPhysicalIndex"]
+        parent = item.get("entPhysicalContainedIn")
+        self.items[index] = item
+        if parent != index and parent in self.items:
+            self.parents[index] = parent
+            self.children.setdefault(parent, []).append(index)
+        else:
+            self.roots.append(index)
+
+    @classmethod
+    def from_items(cls, items, max_depth: int = None):
+        """
+        Rebuild the tree from a flattened inventory, such as the one returned by get_inventory_for_device.
+        Siblings are ordered by entPhysicalParentRelPos, and items contained in one of their descendants are dropped.
+
+        :param items: Inventory items in any order
+        :param max_depth: Drop items nested deeper than this, roots being depth 0
+        """
+        by_parent = {}
+        indexes = set()
+        for item in items:
+            indexes.add(item["entPhysicalIndex"])
+            by_parent.setdefault(item.get("entPhysicalContainedIn"), []).append(item)
+        tree = cls()
+        level = sorted(
+            (
+                item
+                for parent, children in by_parent.items()
+                for item in children
+                if parent not in indexes or parent == item["entPhysicalIndex"]
+            ),
+            key=_position,
+        )
+        depth = 0
+        while level and (max_depth is None or depth <= max_depth):
+            for item in level:
+                tree.add(item)
+            level = [
+                child
+                for item in level
+                for child in sorted(by_parent.get(item["entPhysicalIndex"], ()), key=_position)
+                if child["entPhysicalIndex"] not in tree
+            ]
+            depth += 1
+        return tree
+
+    def walk(self, index=None, depth: int = 0):
+        """
+        Yield (depth, item) for every item below index depth first, or for the whole tree if index is not given.
+
+        :param index: entPhysicalIndex to start from
+        :param depth: Depth reported for the first level yielded
+        """
+        start = self.roots if index is None else self.children.get(index, [])
+        stack = [(depth, child) for child in reversed(start)]
+        while stack:
+            depth, index = stack.pop()
+            yield depth, self.items[index]
+            stack.extend((depth + 1, child) for child in reversed(self.children.get(index, [])))
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def __contains__(self, index):
+        return index in self.items
 
 
 class Inventory(LibreNMS):
     """Includes all the methods available to the Inventory endpoint."""
 
-    def __init__(self, url=None, token=None, verify=True):
-        super().__init__(url, token, verify)
+    def __init__(self, url=None, token=None, verify=True, **kwargs):
+        super().__init__(url, token, verify, **kwargs)
         self.base_url = self.url
         self.url = f"{self.url}/api/v0/inventory"
 
@@ -41,7 +143,7 @@ class Inventory(LibreNMS):
                 "entPhysicalContainedIn": ent_physical_contained_in,
             }
         )
-        return get(
+        return self._get(
             f"{self.url}/{device}",
             parameters,
             headers=self.headers,
@@ -71,9 +173,78 @@ class Inventory(LibreNMS):
                 "entPhysicalContainedIn": ent_physical_contained_in,
             }
         )
-        return get(
+        return self._get(
             f"{self.url}/{device}/all",
             parameters,
             headers=self.headers,
             verify=self.verify,
         )
+
+    def inventory_records(self, device: str, ent_physical_class: str = None):
+        """
+        Retrieve the flattened inventory for a device as compact InventoryItem records.
+
+        :param device: Can be either the device hostname or ID
+        :param ent_physical_class: Used to restrict the class of the inventory.
+        """
+        response = self.get_inventory_for_device(device, ent_physical_class)
+        response.raise_for_status()
+        return list(InventoryItem.from_items(response.json().get("inventory") or []))
+
+    def walk_inventory(  # pylint: disable=R0913
+        self,
+        device: str,
+        max_depth: int = None,
+        max_workers: int = 8,
+        flat_threshold: int = 50,
+        ent_physical_class: str = None,
+    ):
+        """
+        Retrieve the whole inventory tree of a device by following entPhysicalContainedIn.
+        Each level of the tree is requested concurrently with get_inventory,
+        and siblings are ordered by entPhysicalParentRelPos whatever order the requests complete in.
+        When a level would need more than flat_threshold requests,
+        the rest of the tree is instead rebuilt from a single get_inventory_for_device call.
+
+        :param device: Can be either the device hostname or ID
+        :param max_depth: Stop after this many levels below the root entries, which are depth 0
+        :param max_workers: Maximum number of requests in flight while fetching a level
+        :param flat_threshold: Number of requests for one level above which the flattened inventory is fetched instead.
+        0 always uses the flattened inventory and None never does.
+        :param ent_physical_class: Used to restrict the class of the inventory.
+        """
+        if flat_threshold == 0:
+            return self._rebuild_inventory(device, max_depth, ent_physical_class)
+        response = self.get_inventory(device, ent_physical_class)
+        response.raise_for_status()
+        tree = InventoryTree()
+        level = sorted(response.json().get("inventory") or [], key=_position)
+        depth = 0
+        while level:
+            for item in level:
+                tree.add(item)
+            if max_depth is not None and depth >= max_depth:
+                break
+            if flat_threshold is not None and len(level) > flat_threshold:
+                return self._rebuild_inventory(device, max_depth, ent_physical_class)
+            parents = [item["entPhysicalIndex"] for item in level]
+            children = {}
+            for result in bulk(
+                lambda index: self.get_inventory(device, ent_physical_class, index),
+                parents,
+                max_workers,
+            ):
+                if result.error:
+                    raise result.error
+                result.result.raise_for_status()
+                children[result.item] = sorted(result.result.json().get("inventory") or [], key=_position)
+            # Items already in the tree, such as one contained in itself, would otherwise be requested forever
+            level = [child for index in parents for child in children[index] if child["entPhysicalIndex"] not in tree]
+            depth += 1
+        return tree
+
+    def _rebuild_inventory(self, device: str, max_depth: int, ent_physical_class: str):
+        """Build the inventory tree client-side from the flattened inventory of a device."""
+        response = self.get_inventory_for_device(device, ent_physical_class)
+        response.raise_for_status()
+        return InventoryTree.from_items(response.json().get("inventory") or [], max_depth)
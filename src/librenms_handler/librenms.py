@@ -1,14 +1,144 @@
 """Includes all the methods available to the base class."""
-import logging
+from functools import partial
 from os import getenv
 
+from requests import Session
+from requests.adapters import HTTPAdapter
 
-class LibreNMS:  # pylint: disable=R0903
+from librenms_handler.bulk import bulk as run_bulk
+from librenms_handler.coalesce import request_key
+from librenms_handler.metrics import caller_name
+
+
+def create_session(pool_connections: int = 10, pool_maxsize: int = 10, pool_block: bool = False):
+    """
+    Create a keep-alive session that can be shared between endpoint instances.
+
+    :param pool_connections: Number of per-host connection pools to cache
+    :param pool_maxsize: Maximum number of connections kept alive per host
+    :param pool_block: Whether to block and wait for a free connection when the pool is exhausted,
+    instead of opening a throwaway connection.
+    """
+    session = Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class LibreNMS:  # pylint: disable=R0902,R0903
     """Includes all the methods available to the base class."""
 
-    def __init__(self, url, token, verify=True):
-        self.url = getenv("LIBRENMS_URL") or url
-        self.token = getenv("LIBRENMS_TOKEN") or token
+    def __init__(  # pylint: disable=R0913
+        self,
+        url,
+        token,
+        verify=True,
+        session: Session = None,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        cache=None,
+        retry=None,
+        throttle=None,
+        metrics=None,
+        coalesce=None,
+        headers: dict = None,
+    ):
+        """
+        :param url: Full URL to the target LibreNMS instance, LIBRENMS_URL takes precedence when set
+        :param token: Token generated from the LibreNMS api-access page, LIBRENMS_TOKEN takes precedence when set
+        :param verify: Whether to verify the server's TLS certificate
+        :param session: Existing session to send requests through.
+        Pass the session of another endpoint instance to share one connection pool between them.
+        :param pool_connections: Number of per-host connection pools to cache, ignored if session is given
+        :param pool_maxsize: Maximum number of connections kept alive per host, ignored if session is given
+        :param pool_block: Block when the pool is exhausted, ignored if session is given
+        :param cache: librenms_handler.cache.ResponseCache holding the responses of read-mostly methods.
+        Pass the same cache to every endpoint instance so that their writes invalidate each other's entries.
+        :param retry: librenms_handler.resilience.RetryPolicy applied to every request of this instance.
+        Pass the same policy to every endpoint instance so that they share one circuit breaker.
+        :param throttle: librenms_handler.throttle.Throttle limiting the rate and concurrency of requests.
+        Pass the same throttle to every endpoint instance talking to one LibreNMS so that they share its limits.
+        :param metrics: librenms_handler.metrics.MetricsRegistry recording the latency, size and status of requests.
+        Pass the same registry to every endpoint instance to expose all of them from one place.
+        :param coalesce: librenms_handler.coalesce.SingleFlight letting concurrent identical GET requests share one.
+        Pass the same instance to every endpoint instance so that their requests are shared too.
+        :param headers: Headers sent with every request, built from token if not given.
+        When given, url and token are taken as already resolved, as Client passes them,
+        and LIBRENMS_URL and LIBRENMS_TOKEN are not read again.
+        """
+        if headers is None:
+            url = getenv("LIBRENMS_URL") or url
+            token = getenv("LIBRENMS_TOKEN") or token
+            headers = dict({"X-Auth-Token": token})
+        self.url = url
+        self.token = token
         self.verify = verify
-        self.headers = dict({"X-Auth-Token": self.token})
-        logging.basicConfig(level=logging.DEBUG)
+        self.headers = headers
+        self.session = session or self._create_session(pool_connections, pool_maxsize, pool_block)
+        self.cache = cache
+        self.retry = retry
+        self.throttle = throttle
+        self.metrics = metrics
+        self.coalesce = coalesce
+
+    @staticmethod
+    def _create_session(pool_connections: int, pool_maxsize: int, pool_block: bool):
+        """Create the session of an instance given none, see create_session."""
+        return create_session(pool_connections, pool_maxsize, pool_block)
+
+    def _request(self, method: str, url: str, **kwargs):
+        """Send a request through the pooled session of this instance."""
+        kwargs.setdefault("headers", self.headers)
+        kwargs.setdefault("verify", self.verify)
+        send = partial(self.session.request, method, url, **kwargs)
+        if self.throttle is not None:
+            send = partial(self.throttle.call, send)
+        if self.retry is not None:
+            send = partial(self.retry.call, type(self).__name__, method, send)
+        if self.metrics is not None:
+            send = partial(self.metrics.track, type(self).__name__, caller_name(), method, send)
+        if self.coalesce is not None and method == "GET" and not kwargs.get("stream"):
+            key = request_key(url, kwargs.get("params"), kwargs["headers"])
+            if key is not None:
+                return self.coalesce.call(type(self).__name__, key, send)
+        return send()
+
+    def _get(self, url: str, params=None, **kwargs):
+        """Mirrors requests.get, sent through the pooled session."""
+        return self._request("GET", url, params=params, **kwargs)
+
+    def _post(self, url: str, data=None, json=None, **kwargs):
+        """Mirrors requests.post, sent through the pooled session."""
+        return self._request("POST", url, data=data, json=json, **kwargs)
+
+    def _put(self, url: str, data=None, **kwargs):
+        """Mirrors requests.put, sent through the pooled session."""
+        return self._request("PUT", url, data=data, **kwargs)
+
+    def _patch(self, url: str, data=None, **kwargs):
+        """Mirrors requests.patch, sent through the pooled session."""
+        return self._request("PATCH", url, data=data, **kwargs)
+
+    def _delete(self, url: str, **kwargs):
+        """Mirrors requests.delete, sent through the pooled session."""
+        return self._request("DELETE", url, **kwargs)
+
+    def bulk(self, method, devices, max_workers: int = 8, **kwargs):
+        """
+        Run one method of this endpoint for many devices concurrently, yielding a BulkResult per device as it completes.
+        Errors are reported per device rather than raised, see librenms_handler.bulk.bulk.
+
+        :param method: Name of the method to run (e.g. "availability") or the bound method itself
+        :param devices: Iterable of device hostnames or IDs
+        :param max_workers: Maximum number of requests in flight at once
+        :param kwargs: Extra keyword arguments passed to every call
+        """
+        if isinstance(method, str):
+            method = getattr(self, method)
+        return run_bulk(method, devices, max_workers, **kwargs)
+
+    def close(self):
+        """Close the pooled connections held by the session of this instance."""
+        self.session.close()
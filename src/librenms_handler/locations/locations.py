@@ -1,17 +1,17 @@
 """Includes all the methods available to the Locations endpoint."""
-from requests import delete, patch, post
-
 from librenms_handler import LibreNMS
+from librenms_handler.cache import invalidates
 
 
 class Locations(LibreNMS):
     """Includes all the methods available to the Locations endpoint."""
 
-    def __init__(self, url=None, token=None, verify=True):
-        super().__init__(url, token, verify)
+    def __init__(self, url=None, token=None, verify=True, **kwargs):
+        super().__init__(url, token, verify, **kwargs)
         self.base_url = self.url
         self.url = f"{self.url}/api/v0/locations"
 
+    @invalidates("locations")
     def add_location(self, location: str, lat=None, lng=None):
         """
         Add a new location.
@@ -27,25 +27,27 @@ class Locations(LibreNMS):
                 "lng": lng,
             }
         )
-        return post(
+        return self._post(
             self.url,
             json=data,
             headers=self.headers,
             verify=self.verify,
         )
 
+    @invalidates("locations")
     def delete_location(self, location: str):
         """
         Deletes an existing location.
 
         :param location: Name of the location to delete
         """
-        return delete(
+        return self._delete(
             f"{self.url}/{location}",
             headers=self.headers,
             verify=self.verify,
         )
 
+    @invalidates("locations")
     def edit_location(self, location: str, lat=None, lng=None):
         """
         Edits a location.
@@ -60,7 +62,7 @@ class Locations(LibreNMS):
                 "lng": lng,
             }
         )
-        return patch(
+        return self._patch(
             f"{self.url}/{location}",
             json=data,
             headers=self.headers,
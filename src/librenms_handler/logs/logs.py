@@ -1,14 +1,24 @@
 """Includes all the methods available to the Logs endpoint."""
-from requests import get
+from functools import partial
+from time import sleep
 
 from librenms_handler import LibreNMS
+from librenms_handler.paging import load_checkpoint, paginate, save_checkpoint
+
+# ID and timestamp field of the records of each log, used to follow them.
+LOG_FIELDS = {
+    "eventlog": ("event_id", "datetime"),
+    "syslog": ("seq", "timestamp"),
+    "alertlog": ("id", "time_logged"),
+    "authlog": ("id", "datetime"),
+}
 
 
 class Logs(LibreNMS):
     """Includes all the methods available to the Logs endpoint."""
 
-    def __init__(self, url=None, token=None, verify=True):
-        super().__init__(url, token, verify)
+    def __init__(self, url=None, token=None, verify=True, **kwargs):
+        super().__init__(url, token, verify, **kwargs)
         self.base_url = self.url
         self.url = f"{self.url}/api/v0/logs"
 
@@ -38,13 +48,13 @@ class Logs(LibreNMS):
             }
         )
         if device:
-            return get(
+            return self._get(
                 f"{self.url}/eventlog/{device}",
                 parameters,
                 headers=self.headers,
                 verify=self.verify,
             )
-        return get(
+        return self._get(
             f"{self.url}/eventlog",
             parameters,
             headers=self.headers,
@@ -77,13 +87,13 @@ class Logs(LibreNMS):
             }
         )
         if device:
-            return get(
+            return self._get(
                 f"{self.url}/syslog/{device}",
                 parameters,
                 headers=self.headers,
                 verify=self.verify,
             )
-        return get(
+        return self._get(
             f"{self.url}/syslog",
             parameters,
             headers=self.headers,
@@ -116,13 +126,13 @@ class Logs(LibreNMS):
             }
         )
         if device:
-            return get(
+            return self._get(
                 f"{self.url}/alertlog/{device}",
                 parameters,
                 headers=self.headers,
                 verify=self.verify,
             )
-        return get(
+        return self._get(
             f"{self.url}/alertlog",
             parameters,
             headers=self.headers,
@@ -152,9 +162,115 @@ class Logs(LibreNMS):
                 "to": date_to,
             }
         )
-        return get(
+        return self._get(
             f"{self.url}/authlog",
             parameters,
             headers=self.headers,
             verify=self.verify,
         )
+
+    def iter_eventlog(self, device: str = None, date_from=None, date_to=None, **paging):
+        """
+        Iterate over all event logs or event logs for a specific device, one record at a time.
+        Pages are requested with list_eventlog as the records are consumed.
+
+        :param device: ID or hostname of the specific device
+        :param date_from:
+        :param date_to:
+        :param paging: Page size tuning and prefetching options, see librenms_handler.paging.paginate()
+        """
+        return paginate(
+            lambda start, limit: self.list_eventlog(device, start, limit, date_from, date_to),
+            **paging,
+        )
+
+    def iter_syslog(self, device: str = None, date_from=None, date_to=None, **paging):
+        """
+        Iterate over all syslogs or syslogs for a specific device, one record at a time.
+        Pages are requested with list_syslog as the records are consumed.
+
+        :param device: ID or hostname of the specific device
+        :param date_from:
+        :param date_to:
+        :param paging: Page size tuning and prefetching options, see librenms_handler.paging.paginate()
+        """
+        return paginate(
+            lambda start, limit: self.list_syslog(device, start, limit, date_from, date_to),
+            **paging,
+        )
+
+    def iter_alertlog(self, device: str = None, date_from=None, date_to=None, **paging):
+        """
+        Iterate over all alert logs or alert logs for a specific device, one record at a time.
+        Pages are requested with list_alertlog as the records are consumed.
+
+        :param device: ID or hostname of the specific device
+        :param date_from:
+        :param date_to:
+        :param paging: Page size tuning and prefetching options, see librenms_handler.paging.paginate()
+        """
+        return paginate(
+            lambda start, limit: self.list_alertlog(device, start, limit, date_from, date_to),
+            **paging,
+        )
+
+    def iter_authlog(self, date_from=None, date_to=None, **paging):
+        """
+        Iterate over all auth logs, one record at a time.
+        Pages are requested with list_authlog as the records are consumed.
+
+        :param date_from:
+        :param date_to:
+        :param paging: Page size tuning and prefetching options, see librenms_handler.paging.paginate()
+        """
+        return paginate(
+            lambda start, limit: self.list_authlog(start, limit, date_from, date_to),
+            **paging,
+        )
+
+    def follow(  # pylint: disable=R0913,R0914
+        self,
+        log: str = "syslog",
+        device: str = None,
+        checkpoint: str = None,
+        interval: float = 30.0,
+        date_from=None,
+        polls: int = None,
+        **paging,
+    ):
+        """
+        Continuously yield new records of a log, like tail -f.
+        Every poll only asks for records from the newest timestamp seen so far,
+        and drops the records at that timestamp that were already yielded.
+        The high-water mark (timestamp and IDs seen at that timestamp) is saved to checkpoint after every poll,
+        so a restarted follower carries on where the last one stopped.
+
+        :param log: Log to follow, one of eventlog, syslog, alertlog or authlog
+        :param device: ID or hostname of the specific device, not supported by authlog
+        :param checkpoint: Path of the file the high-water mark is saved to, None to keep it in memory only
+        :param interval: Seconds to wait between two polls
+        :param date_from: Timestamp to start from when there is no checkpoint yet, None for the whole log
+        :param polls: Stop after this many polls, None to follow forever
+        :param paging: Page size tuning and prefetching options, see librenms_handler.paging.paginate()
+        """
+        id_field, timestamp_field = LOG_FIELDS[log]
+        newest, seen = load_checkpoint(checkpoint) if checkpoint else (None, set())
+        newest = newest or date_from
+        listing = self.list_authlog if log == "authlog" else partial(getattr(self, f"list_{log}"), device)
+        poll = 0
+        while polls is None or poll < polls:
+            since, seen_since = newest, seen
+            for record in paginate(partial(listing, date_from=since), **paging):
+                timestamp, record_id = record.get(timestamp_field), record.get(id_field)
+                if since is not None and (timestamp < since or (timestamp == since and record_id in seen_since)):
+                    continue
+                if newest is None or timestamp > newest:
+                    newest, seen = timestamp, set()
+                if timestamp == newest:
+                    seen.add(record_id)
+                yield record
+            if checkpoint and newest is not None:
+                save_checkpoint(checkpoint, newest, seen)
+            poll += 1
+            if polls is None or poll < polls:
+                sleep(interval)
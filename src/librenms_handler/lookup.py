@@ -0,0 +1,143 @@
+"""Answers "where is this MAC/IP plugged in?" locally, from one bulk load of the FDB and ARP tables."""
+import re
+from collections import namedtuple
+from threading import Event, Lock, Thread
+from time import time
+
+PortLocation = namedtuple("PortLocation", ["device", "port", "vlan"])
+PortLocation.__doc__ = """
+Switch port a MAC address was learnt on.
+
+:param device: Hostname of the device, or its ID when the hostname is not returned
+:param port: Interface name of the port, or its ID when the name is not returned
+:param vlan: VLAN number (802.1Q tag) the MAC address was learnt in, resolved from the vlan_id of the FDB entry,
+which is the key of the VLAN in the vlans table of LibreNMS and not its number. None if the VLAN is not known.
+"""
+
+_SEPARATORS = re.compile(r"[^0-9a-f]")
+
+
+def normalise_mac(mac: str):
+    """Return mac as the 12 lower case hexadecimal digits LibreNMS stores, whatever its notation."""
+    return _SEPARATORS.sub("", mac.lower())
+
+
+def _apply(live: dict, fresh: dict):
+    """Update live in place to match fresh, returning the number of keys added, changed and removed."""
+    removed = [key for key in live if key not in fresh]
+    for key in removed:
+        del live[key]
+    added = changed = 0
+    for key, value in fresh.items():
+        current = live.get(key)
+        if current != value:
+            added += current is None
+            changed += current is not None
+            live[key] = value
+    return added, changed, len(removed)
+
+
+class AddressIndex:  # pylint: disable=R0902
+    """
+    In-memory index of MAC address to switch ports and IP address to MAC address.
+    Lookups are answered from hash maps without any request,
+    while refresh() reloads the tables and only applies what changed, so lookups never see an empty index.
+    The health of the index is kept in last_refreshed, the time of the last successful refresh or None,
+    and last_error, the exception raised by the last scheduled refresh, None once a refresh succeeds.
+
+    :param switching: Switching endpoint the FDB is loaded from with list_fdb_detail, and the VLANs with list_vlans
+    :param arp: ARP endpoint the ARP table is loaded from with list_arp, None to skip IP addresses
+    :param arp_queries: list_arp queries whose results make up the ARP table, such as CIDR networks
+    """
+
+    def __init__(self, switching, arp=None, arp_queries=("0.0.0.0/0",)):
+        self.switching = switching
+        self.arp = arp
+        self.arp_queries = arp_queries
+        self.macs = {}
+        self.ips = {}
+        self.last_refreshed = None
+        self.last_error = None
+        self._lock = Lock()
+        self._stop = Event()
+        self._thread = None
+
+    def refresh(self):
+        """
+        Reload the FDB and ARP tables and apply the difference to the index.
+        Returns a dict of how many MAC and IP entries were added, changed and removed.
+
+        Both tables are downloaded in full every time: the API has no way to list only the FDB or ARP entries
+        that changed since a given time. What refresh saves is the rebuild of the index, not the transfer:
+        the FDB is decoded as it is streamed, and only the entries that differ are written to the live index.
+        """
+        tags = self._vlan_tags()
+        macs = {}
+        for entry in self.switching.iter_fdb_detail():
+            mac = entry.get("mac_address") or entry.get("mac")
+            if not mac:
+                continue
+            location = PortLocation(
+                entry.get("hostname") or entry.get("device_id"),
+                entry.get("ifName") or entry.get("port_id"),
+                tags.get(str(entry.get("vlan_id"))),
+            )
+            macs.setdefault(normalise_mac(mac), set()).add(location)
+        ips = {}
+        for query in self.arp_queries if self.arp else ():
+            response = self.arp.list_arp(query)
+            response.raise_for_status()
+            for entry in response.json().get("arp") or []:
+                if entry.get("ipv4_address") and entry.get("mac_address"):
+                    ips[entry["ipv4_address"]] = normalise_mac(entry["mac_address"])
+        macs = {mac: frozenset(locations) for mac, locations in macs.items()}
+        with self._lock:
+            changes = {"macs": _apply(self.macs, macs), "ips": _apply(self.ips, ips)}
+        self.last_refreshed, self.last_error = time(), None
+        return changes
+
+    def _vlan_tags(self):
+        """Return the number of every VLAN by its vlan_id, the key the FDB entries refer to VLANs by."""
+        response = self.switching.list_vlans()
+        response.raise_for_status()
+        return {str(vlan["vlan_id"]): vlan.get("vlan_vlan") for vlan in response.json().get("vlans") or []}
+
+    def locate_mac(self, mac: str):
+        """Return the set of PortLocation a MAC address was learnt on, empty if it is unknown."""
+        return self.macs.get(normalise_mac(mac), frozenset())
+
+    def mac_for_ip(self, ip: str):
+        """Return the MAC address an IP address resolves to in the ARP table, None if it is unknown."""
+        return self.ips.get(ip)
+
+    def locate_ip(self, ip: str):
+        """Return the set of PortLocation the MAC address of an IP address was learnt on, empty if it is unknown."""
+        mac = self.mac_for_ip(ip)
+        return self.locate_mac(mac) if mac else frozenset()
+
+    def start(self, interval: float = 300.0):
+        """
+        Refresh the index now, then every interval seconds from a background thread until stop() is called.
+        A failed scheduled refresh keeps the previous entries and is retried at the next interval, see last_error.
+
+        :param interval: Seconds between two refreshes
+        """
+        self.refresh()
+        self._stop.clear()
+        self._thread = Thread(target=self._run, args=(interval,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the scheduled refreshes started by start()."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self, interval: float):
+        """Refresh the index every interval seconds until stopped."""
+        while not self._stop.wait(interval):
+            try:
+                self.refresh()
+            except Exception as error:  # pylint: disable=broad-except
+                self.last_error = error
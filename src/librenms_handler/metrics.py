@@ -0,0 +1,219 @@
+"""Opt-in instrumentation of the requests sent by the endpoints, exposed in the Prometheus text format."""
+import sys
+from bisect import bisect_left
+from collections import Counter
+from contextlib import ExitStack, nullcontext
+from threading import Lock
+from time import perf_counter
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+_VERBS = {"_request", "_get", "_post", "_put", "_patch", "_delete"}
+
+
+def caller_name():
+    """Return the name of the endpoint method a request is sent from, skipping the _get/_post/... helpers."""
+    frame = sys._getframe(1)  # pylint: disable=W0212
+    while frame is not None and frame.f_code.co_name in _VERBS:
+        frame = frame.f_back
+    return frame.f_code.co_name if frame is not None else "unknown"
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram of observed values, the way Prometheus exposes them.
+
+    :param buckets: Sorted upper bounds of the buckets, a +Inf bucket is always added
+    """
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        """Add one value to the histogram."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """Return tuples of upper bound and number of values at or below it, ending with +Inf."""
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            yield bound, total
+
+
+def _escape(value):
+    """Escape a label value for the text exposition format."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    """Format labels for the text exposition format."""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _bound(value: float):
+    """Format a bucket bound the way Prometheus clients do."""
+    return "+Inf" if value == float("inf") else repr(float(value))
+
+
+class MetricsRegistry:  # pylint: disable=R0902
+    """
+    Records the latency, response size, status code and in-flight count of every request, per endpoint and method.
+    Pass one registry as metrics= to every endpoint instance, or to a Client, and scrape render().
+    Endpoints created without a registry skip all of this.
+
+    :param latency_buckets: Upper bounds, in seconds, of the latency histogram buckets
+    :param size_buckets: Upper bounds, in bytes, of the response size histogram buckets
+    :param hooks: Callables taking a span name and a dictionary of attributes and returning a context manager
+    entered around each request, such as the start_as_current_span method of an OpenTelemetry tracer.
+    When the entered value has a set_attribute method, the status code and size of the response are set on it.
+    """
+
+    def __init__(self, latency_buckets=LATENCY_BUCKETS, size_buckets=SIZE_BUCKETS, hooks=()):
+        self.latency_buckets = tuple(latency_buckets)
+        self.size_buckets = tuple(size_buckets)
+        self.hooks = list(hooks)
+        self.latency = {}
+        self.size = {}
+        self.statuses = Counter()
+        self.errors = Counter()
+        self.in_flight = Counter()
+        self._lock = Lock()
+
+    def add_hook(self, hook):
+        """Add a span hook, see hooks."""
+        self.hooks.append(hook)
+
+    def track(self, endpoint: str, name: str, method: str, send):
+        """
+        Send a request with send() and record it.
+
+        :param endpoint: Class name of the endpoint, e.g. "Devices"
+        :param name: Name of the endpoint method sending the request, e.g. "list_devices"
+        :param method: HTTP method of the request
+        :param send: Callable sending the request and returning its response
+        """
+        with ExitStack() if self.hooks else nullcontext() as spans:
+            entered = self._spans(spans, endpoint, name, method)
+            key = self._started(endpoint, name)
+            start = perf_counter()
+            try:
+                response = send()
+            except BaseException as error:
+                self._failed(key, error)
+                raise
+            self._finished(key, perf_counter() - start, response, entered)
+            return response
+
+    async def atrack(self, endpoint: str, name: str, method: str, send):
+        """Same as track, for a send() returning an awaitable of the response."""
+        with ExitStack() if self.hooks else nullcontext() as spans:
+            entered = self._spans(spans, endpoint, name, method)
+            key = self._started(endpoint, name)
+            start = perf_counter()
+            try:
+                response = await send()
+            except BaseException as error:
+                self._failed(key, error)
+                raise
+            self._finished(key, perf_counter() - start, response, entered)
+            return response
+
+    def _spans(self, spans, endpoint: str, name: str, method: str):
+        """Enter the span hooks, returning the values they entered."""
+        if not self.hooks:
+            return ()
+        attributes = {"librenms.endpoint": endpoint, "librenms.method": name, "http.method": method}
+        return [spans.enter_context(hook(f"{endpoint}.{name}", attributes)) for hook in self.hooks]
+
+    def _started(self, endpoint: str, name: str):
+        """Count a request as in flight, returning the key it is recorded under."""
+        key = endpoint, name
+        with self._lock:
+            self.in_flight[key] += 1
+        return key
+
+    def _failed(self, key, error: BaseException):
+        with self._lock:
+            self.in_flight[key] -= 1
+            self.errors[key + (type(error).__name__,)] += 1
+
+    def _finished(self, key, latency: float, response, spans):
+        """Record a response, sized by its Content-Length or else by its body when it has been read."""
+        length = response.headers.get("Content-Length")
+        body = getattr(response, "_content", None)  # pylint: disable=W0212
+        if length is None and isinstance(body, bytes):
+            length = len(body)
+        with self._lock:
+            self.in_flight[key] -= 1
+            if key not in self.latency:
+                self.latency[key] = Histogram(self.latency_buckets)
+                self.size[key] = Histogram(self.size_buckets)
+            self.latency[key].observe(latency)
+            if length is not None:
+                self.size[key].observe(int(length))
+            self.statuses[key + (response.status_code,)] += 1
+        for span in spans:
+            if hasattr(span, "set_attribute"):
+                span.set_attribute("http.status_code", response.status_code)
+                if length is not None:
+                    span.set_attribute("http.response_content_length", int(length))
+
+    def snapshot(self):
+        """Return the request count, mean latency, bytes received and status counts of every endpoint method."""
+        with self._lock:
+            return {
+                f"{endpoint}.{name}": {
+                    "requests": histogram.count,
+                    "mean_latency": histogram.sum / histogram.count if histogram.count else 0.0,
+                    "bytes": int(self.size[endpoint, name].sum),
+                    "statuses": {
+                        status: count
+                        for (status_endpoint, status_name, status), count in self.statuses.items()
+                        if (status_endpoint, status_name) == (endpoint, name)
+                    },
+                }
+                for (endpoint, name), histogram in sorted(self.latency.items())
+            }
+
+    def render(self):  # pylint: disable=R0914
+        """Return every metric in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for metric, unit, histograms, description in (
+                (
+                    "request_duration",
+                    "seconds",
+                    self.latency,
+                    "Time spent sending a request, including throttling and retries with their backoff, "
+                    "and reading the body unless it is streamed.",
+                ),
+                ("response_size", "bytes", self.size, "Size of the response bodies."),
+            ):
+                full = f"librenms_handler_{metric}_{unit}"
+                lines += [f"# HELP {full} {description}", f"# TYPE {full} histogram"]
+                for (endpoint, name), histogram in sorted(histograms.items()):
+                    for bound, count in histogram.cumulative():
+                        labels = _labels(endpoint=endpoint, method=name, le=_bound(bound))
+                        lines.append(f"{full}_bucket{labels} {count}")
+                    labels = _labels(endpoint=endpoint, method=name)
+                    lines.append(f"{full}_sum{labels} {histogram.sum!r}")
+                    lines.append(f"{full}_count{labels} {histogram.count}")
+            for metric, kind, values, names, description in (
+                ("responses_total", "counter", self.statuses, ("status",), "Responses received per status code."),
+                ("errors_total", "counter", self.errors, ("error",), "Requests that raised instead of responding."),
+                ("requests_in_flight", "gauge", self.in_flight, (), "Requests sent and waiting for a response."),
+            ):
+                full = f"librenms_handler_{metric}"
+                lines += [f"# HELP {full} {description}", f"# TYPE {full} {kind}"]
+                for key, value in sorted(values.items(), key=lambda item: tuple(map(str, item[0]))):
+                    labels = _labels(endpoint=key[0], method=key[1], **dict(zip(names, key[2:])))
+                    lines.append(f"{full}{labels} {value}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,171 @@
+"""Compact typed records for the most numerous results of the API."""
+from sys import intern
+
+
+class Record:
+    """
+    Base class of the typed records.
+    Each record only keeps the fields named in its __slots__, as the raw values returned by the API,
+    and has no per-instance dictionary, so it takes a fraction of the memory of the dictionary it was built from.
+    Fields missing from the response are set to None.
+    String values of the fields named in shared repeat across many records (hostnames, dates, ...)
+    and are interned, so each distinct value is only stored once.
+
+    Fields are not parsed lazily on access: the raw text of every field would have to be kept until then,
+    which takes more memory than the decoded values. Laziness is per record instead, from_items building
+    each record as the streamed response yields its item, so that only one decoded dictionary exists at a time.
+    """
+
+    __slots__ = ()
+    shared = ()
+    _shared_positions = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._shared_positions = tuple(cls.__slots__.index(name) for name in cls.shared)
+
+    def __init__(self, *values, **fields):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+        for name in self.__slots__[len(values) :]:
+            setattr(self, name, fields.get(name))
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """Build a record from one item of an API response, dropping the fields it does not declare."""
+        values = list(map(data.get, cls.__slots__))
+        for position in cls._shared_positions:
+            if isinstance(values[position], str):
+                values[position] = intern(values[position])
+        return cls(*values)
+
+    @classmethod
+    def from_items(cls, items):
+        """Lazily build a record from every item of an iterable, such as the records of a streamed response."""
+        return map(cls.from_dict, items)
+
+    def as_dict(self):
+        """Return the fields of the record as a dictionary."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other):
+        if type(self) is not type(other):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class Device(Record):  # pylint: disable=R0902
+    """A device, as returned by Devices.list_devices and Devices.get_device."""
+
+    __slots__ = (
+        "device_id",
+        "hostname",
+        "sysName",
+        "ip",
+        "os",
+        "hardware",
+        "version",
+        "serial",
+        "status",
+        "disabled",
+        "ignore",
+        "location",
+        "type",
+        "uptime",
+        "last_polled",
+    )
+    shared = ("os", "hardware", "version", "location", "type", "last_polled")
+
+
+class Port(Record):  # pylint: disable=R0902
+    """A port, as returned by Devices.get_port_graphs and Devices.get_port_stats_by_port_hostname."""
+
+    __slots__ = (
+        "port_id",
+        "device_id",
+        "ifIndex",
+        "ifName",
+        "ifAlias",
+        "ifDescr",
+        "ifType",
+        "ifSpeed",
+        "ifAdminStatus",
+        "ifOperStatus",
+        "ifInOctets_rate",
+        "ifOutOctets_rate",
+        "ifInErrors",
+        "ifOutErrors",
+    )
+    shared = ("ifType", "ifAdminStatus", "ifOperStatus")
+
+
+class FdbEntry(Record):  # pylint: disable=R0902
+    """A forwarding database entry, as returned by Switching.list_fdb and Switching.list_fdb_detail."""
+
+    __slots__ = (
+        "ports_fdb_id",
+        "port_id",
+        "device_id",
+        "mac_address",
+        "vlan_id",
+        "hostname",
+        "sysName",
+        "ifName",
+        "ifAlias",
+        "ifDescr",
+        "last_seen",
+        "updated_at",
+    )
+    shared = ("hostname", "sysName", "ifName", "ifAlias", "ifDescr", "last_seen", "updated_at")
+
+
+class ArpEntry(Record):
+    """An ARP entry, as returned by ARP.list_arp."""
+
+    __slots__ = ("port_id", "mac_address", "ipv4_address", "context_name")
+    shared = ("context_name",)
+
+
+class Link(Record):  # pylint: disable=R0902
+    """An LLDP/CDP adjacency, as returned by Switching.list_links and Switching.get_links."""
+
+    __slots__ = (
+        "id",
+        "local_port_id",
+        "local_device_id",
+        "remote_port_id",
+        "remote_device_id",
+        "remote_hostname",
+        "remote_port",
+        "remote_platform",
+        "remote_version",
+        "protocol",
+        "active",
+    )
+    shared = ("protocol", "remote_hostname", "remote_port", "remote_platform", "remote_version")
+
+
+class InventoryItem(Record):  # pylint: disable=R0902
+    """An inventory item, as returned by Inventory.get_inventory and Inventory.get_inventory_for_device."""
+
+    __slots__ = (
+        "entPhysical_id",
+        "device_id",
+        "entPhysicalIndex",
+        "entPhysicalContainedIn",
+        "entPhysicalParentRelPos",
+        "entPhysicalClass",
+        "entPhysicalName",
+        "entPhysicalDescr",
+        "entPhysicalModelName",
+        "entPhysicalSerialNum",
+        "entPhysicalMfgName",
+        "entPhysicalHardwareRev",
+        "entPhysicalFirmwareRev",
+        "entPhysicalSoftwareRev",
+    )
+    shared = ("entPhysicalClass", "entPhysicalMfgName", "entPhysicalModelName", "entPhysicalDescr")
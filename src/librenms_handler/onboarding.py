@@ -0,0 +1,135 @@
+"""Adds devices in bulk from CSV or YAML, skipping the ones LibreNMS already has."""
+import csv
+import os
+from collections import deque, namedtuple
+from contextlib import nullcontext
+from inspect import signature
+
+from librenms_handler.bulk import bulk
+from librenms_handler.throttle import TokenBucket
+
+ImportResult = namedtuple("ImportResult", ["row", "status", "response", "error"])
+ImportResult.__doc__ = """
+Outcome of importing one row with import_devices().
+
+:param row: The row, as given
+:param status: "added", "exists" when LibreNMS already has the device, "done" when a previous run added it,
+"duplicate" when an earlier row has the same hostname, or "failed", including rows without a hostname
+:param response: Response of add_device, None if it was not called or raised
+:param error: Exception raised by add_device, or why the row could not be sent, None otherwise
+"""
+
+_BOOLEANS = {"force_add", "snmp_disable"}
+_INTEGERS = {"port", "poller_group"}
+
+
+def read_rows(path: str):
+    """
+    Read the devices to import from a CSV file with a header row, or a YAML file holding a list of mappings.
+    Columns are named after the parameters of Devices.add_device. Reading YAML requires PyYAML.
+
+    :param path: Path of a .csv, .yml or .yaml file
+    """
+    if path.endswith((".yml", ".yaml")):
+        try:
+            import yaml  # pylint: disable=C0415
+        except ImportError as error:
+            raise ImportError(
+                "Reading YAML requires PyYAML, install it with `pip install librenms-handler[yaml]`"
+            ) from error
+        with open(path, encoding="utf-8") as file:
+            yield from yaml.safe_load(file) or []
+        return
+    with open(path, encoding="utf-8", newline="") as file:
+        yield from csv.DictReader(file)
+
+
+def device_arguments(row: dict, parameters):
+    """Return the add_device keyword arguments of a row, converting the text values a CSV file holds."""
+    arguments = {}
+    for name, value in row.items():
+        if name not in parameters or value is None or value == "":
+            continue
+        if isinstance(value, str) and name in _BOOLEANS:
+            value = value.strip().lower() in ("1", "true", "yes", "y")
+        elif isinstance(value, str) and name in _INTEGERS:
+            value = int(value)
+        arguments[name] = value
+    return arguments
+
+
+def _known_names(devices):
+    """Return the lower case hostnames, sysNames and IPs of every device LibreNMS already has, from one listing."""
+    names = set()
+    for device in devices.iter_devices():
+        for field in ("hostname", "sysName", "ip", "overwrite_ip"):
+            if device.get(field):
+                names.add(str(device[field]).lower())
+    return names
+
+
+def import_devices(  # pylint: disable=R0914
+    devices, rows, journal: str = None, max_workers: int = 4, rate: float = None
+):
+    """
+    Add many devices concurrently, yielding an ImportResult per row.
+    The existing devices are listed once up front and rows matching one of them are not sent.
+    Hostnames that were added or found to exist are appended to journal,
+    so a run that was interrupted can be started again without re-sending the rows it completed.
+
+    :param devices: Devices endpoint the devices are added with
+    :param rows: Iterable of mappings of add_device parameters, such as read_rows()
+    :param journal: Path of the file completed hostnames are recorded in, None to not record them
+    :param max_workers: Maximum number of add_device calls running at once
+    :param rate: Maximum add_device calls per second, None for no limit
+    """
+    parameters = set(signature(devices.add_device).parameters)
+    bucket = TokenBucket(rate) if rate else None
+    completed = set()
+    if journal and os.path.exists(journal):
+        with open(journal, encoding="utf-8") as file:
+            completed = {line.strip() for line in file if line.strip()}
+    known = _known_names(devices)
+    submitted = set()
+    skipped = deque()
+
+    def pending():
+        for row in rows:
+            if not row.get("hostname"):
+                skipped.append(ImportResult(row, "failed", None, ValueError("The row has no hostname")))
+                continue
+            hostname = str(row["hostname"]).lower()
+            if hostname in completed:
+                skipped.append(ImportResult(row, "done", None, None))
+            elif hostname in known or str(row.get("overwrite_ip") or "").lower() in known:
+                skipped.append(ImportResult(row, "exists", None, None))
+            elif hostname in submitted:
+                skipped.append(ImportResult(row, "duplicate", None, None))
+            else:
+                submitted.add(hostname)
+                yield row
+
+    def add(row):
+        if bucket:
+            bucket.acquire()
+        return devices.add_device(**device_arguments(row, parameters))
+
+    with open(journal, "a", encoding="utf-8") if journal else nullcontext() as record:
+        for result in bulk(add, pending(), max_workers):
+            while skipped:
+                yield _recorded(skipped.popleft(), record)
+            if result.error:
+                yield ImportResult(result.item, "failed", None, result.error)
+            else:
+                status = "added" if result.result.ok else "failed"
+                yield _recorded(ImportResult(result.item, status, result.result, None), record)
+        while skipped:
+            yield _recorded(skipped.popleft(), record)
+
+
+def _recorded(result: ImportResult, record):
+    """Append the hostname of a result that needs no further attempt to the journal, if any, and return it."""
+    if record and result.status in ("added", "exists"):
+        record.write(f"{str(result.row['hostname']).lower()}\n")
+        record.flush()
+    return result
@@ -0,0 +1,148 @@
+"""Fetches the Oxidized configs of every device concurrently, keeping them in a content-addressed store."""
+import hashlib
+import json
+import os
+from collections import namedtuple
+from threading import Lock
+
+from librenms_handler.bulk import bulk
+from librenms_handler.files import atomic_write
+
+ConfigChange = namedtuple("ConfigChange", ["hostname", "config", "digest", "previous"])
+ConfigChange.__doc__ = """
+A config that changed since the last fetch_configs() run.
+
+:param hostname: Hostname of the device, as listed by list_oxidized
+:param config: The config, as text
+:param digest: SHA-256 of the config, naming its object in the store
+:param previous: Digest of the config stored by the previous run, None for a device seen for the first time
+"""
+
+
+def config_digest(config: str):
+    """Return the SHA-256 hex digest a config is stored under."""
+    return hashlib.sha256(config.encode("utf-8")).hexdigest()
+
+
+def _write(path: str, data: bytes):
+    """Write data to path atomically, readable by its owner only as configs hold secrets."""
+    with atomic_write(path, permissions=0o600) as file:
+        file.write(data)
+
+
+class ConfigStore:
+    """
+    Directory of configs stored once per distinct content, as objects/<digest[:2]>/<digest>,
+    with index.json mapping each hostname to the digest of its latest config.
+    Devices sharing a config, and configs that did not change between runs, take no extra space.
+
+    :param directory: Directory of the store, created if missing
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.index_path = os.path.join(directory, "index.json")
+        os.makedirs(os.path.join(directory, "objects"), exist_ok=True)
+        self.index = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, encoding="utf-8") as file:
+                self.index = json.load(file)
+        self._lock = Lock()
+
+    def path(self, digest: str):
+        """Return the path of the object holding the config with the given digest."""
+        return os.path.join(self.directory, "objects", digest[:2], digest)
+
+    def put(self, config: str):
+        """Store a config unless an identical one is stored already, returning its digest."""
+        digest = config_digest(config)
+        path = self.path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            try:
+                _write(path, config.encode("utf-8"))
+            except OSError:
+                # Objects are named after their content, so one stored concurrently by another writer is the same
+                if not os.path.exists(path):
+                    raise
+        return digest
+
+    def get(self, hostname: str):
+        """Return the latest config stored for a hostname, None if there is none."""
+        digest = self.index.get(hostname)
+        if digest is None:
+            return None
+        with open(self.path(digest), encoding="utf-8") as file:
+            return file.read()
+
+    def update(self, hostname: str, config: str):
+        """
+        Store the config of a hostname, returning a ConfigChange if it differs from the one stored before, else None.
+        The index is only written by save().
+        """
+        digest = config_digest(config)
+        with self._lock:
+            previous = self.index.get(hostname)
+        if digest == previous:
+            return None
+        self.put(config)
+        with self._lock:
+            self.index[hostname] = digest
+        return ConfigChange(hostname, config, digest, previous)
+
+    def save(self):
+        """Write the index to disk."""
+        with self._lock:
+            data = json.dumps(self.index, indent=1, sort_keys=True).encode("utf-8")
+        _write(self.index_path, data)
+
+    def prune(self):
+        """Delete the objects no hostname of the index refers to any more, returning how many were deleted."""
+        with self._lock:
+            referenced = set(self.index.values())
+        deleted = 0
+        objects = os.path.join(self.directory, "objects")
+        for prefix in os.listdir(objects):
+            for digest in os.listdir(os.path.join(objects, prefix)):
+                if digest not in referenced:
+                    os.remove(os.path.join(objects, prefix, digest))
+                    deleted += 1
+        return deleted
+
+
+def _fetch_config(devices, hostname: str):
+    """Return the config of one device, as text."""
+    response = devices.get_oxidized_config(hostname)
+    response.raise_for_status()
+    return response.json()["config"]
+
+
+def fetch_configs(devices, store, max_workers: int = 8, hostnames=None):
+    """
+    Fetch the Oxidized config of many devices concurrently, yielding a BulkResult only for the configs that changed
+    since the last run, and for the devices whose config could not be fetched.
+    The result of a changed config is a ConfigChange, and a failed fetch is reported in its error.
+    The index of the store is saved once every device has been processed, or the iteration stopped.
+
+    :param devices: Devices endpoint to fetch the configs with
+    :param store: ConfigStore, or the directory of one
+    :param max_workers: Maximum number of configs fetched at once
+    :param hostnames: Hostnames to fetch the config of, every device listed by list_oxidized if not given
+    """
+    if isinstance(store, str):
+        store = ConfigStore(store)
+    if hostnames is None:
+        response = devices.list_oxidized()
+        response.raise_for_status()
+        hostnames = [node["hostname"] for node in response.json()]
+    results = bulk(
+        lambda hostname: store.update(hostname, _fetch_config(devices, hostname)),
+        hostnames,
+        max_workers,
+    )
+    try:
+        for result in results:
+            if result.error or result.result:
+                yield result
+    finally:
+        store.save()
@@ -0,0 +1,79 @@
+"""Pages through start/limit listings with an adaptive page size, and keeps the checkpoints of log followers."""
+import json
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic
+
+from librenms_handler.files import atomic_write
+
+def load_checkpoint(path: str):
+    """
+    Read the high-water mark of a log follower, returning its timestamp and the IDs seen at that timestamp.
+    A missing checkpoint file returns (None, set()).
+
+    :param path: Path of the checkpoint file
+    """
+    try:
+        with open(path, encoding="utf-8") as file:
+            checkpoint = json.load(file)
+    except FileNotFoundError:
+        return None, set()
+    return checkpoint["timestamp"], set(checkpoint["ids"])
+
+
+def save_checkpoint(path: str, timestamp, ids):
+    """
+    Atomically replace the checkpoint file of a log follower with a new high-water mark.
+
+    :param path: Path of the checkpoint file
+    :param timestamp: Timestamp of the newest record yielded
+    :param ids: IDs of the records yielded with that timestamp
+    """
+    with atomic_write(path, "w", encoding="utf-8") as file:
+        json.dump({"timestamp": timestamp, "ids": sorted(ids, key=str)}, file)
+
+
+def _fetch_page(fetch, start: int, limit: int):
+    """Fetch one page of logs, returning its records and how long the request took."""
+    began = monotonic()
+    response = fetch(start, limit)
+    response.raise_for_status()
+    return response.json().get("logs") or [], monotonic() - began
+
+
+def paginate(  # pylint: disable=R0913
+    fetch,
+    page_size: int = 500,
+    min_page_size: int = 50,
+    max_page_size: int = 10000,
+    target_latency: float = 1.0,
+    prefetch: bool = False,
+):
+    """
+    Page through a log listing with start/limit, yielding its records one at a time.
+    The page size is doubled while pages return in under half of target_latency,
+    and halved while they take longer than target_latency.
+
+    :param fetch: Callable taking (start, limit) and returning the response of one page
+    :param page_size: Number of records requested by the first page
+    :param min_page_size: Smallest page size the tuning may shrink to
+    :param max_page_size: Largest page size the tuning may grow to
+    :param target_latency: Seconds a single page request should take
+    :param prefetch: Request the next page in the background while the current one is being consumed
+    """
+    start, limit = 0, page_size
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        page = executor.submit(_fetch_page, fetch, start, limit)
+        while page:
+            records, elapsed = page.result()
+            more, page = len(records) >= limit, None
+            if more:
+                start += len(records)
+                if elapsed < target_latency / 2:
+                    limit = min(limit * 2, max_page_size)
+                elif elapsed > target_latency:
+                    limit = max(limit // 2, min_page_size)
+                if prefetch:
+                    page = executor.submit(_fetch_page, fetch, start, limit)
+            yield from records
+            if more and not page:
+                page = executor.submit(_fetch_page, fetch, start, limit)
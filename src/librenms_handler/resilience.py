@@ -0,0 +1,182 @@
+"""Retries failed requests and stops sending them while the LibreNMS API is unhealthy."""
+from collections import Counter
+from email.utils import parsedate_to_datetime
+from random import uniform
+from threading import Lock
+from time import monotonic, sleep, time
+
+from requests.exceptions import ChunkedEncodingError
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from requests.exceptions import RequestException, Timeout
+
+# Connection failures worth retrying, a connection reset while the body is read included
+RETRYABLE_ERRORS = (RequestsConnectionError, Timeout, ChunkedEncodingError)
+
+
+class CircuitOpenError(RequestException):
+    """Raised instead of sending a request while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Fails fast after repeated server errors, then lets a single trial request through once reset_timeout has passed.
+    A successful trial closes the circuit again and a failed one re-opens it.
+
+    :param failure_threshold: Consecutive failures after which the circuit opens
+    :param reset_timeout: Seconds the circuit stays open before a trial request is allowed
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._lock = Lock()
+
+    def allow(self):
+        """Return whether a request may be sent now."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        """Close the circuit and reset the failure count."""
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        """Count a failure, opening the circuit when the threshold is reached or a trial request failed."""
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = monotonic()
+
+
+def retry_after(response):
+    """Return the seconds asked for by the Retry-After header of response, or None if it has none."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:  # pylint: disable=R0902
+    """
+    Retries idempotent requests that failed with a connection error or a retryable status,
+    waiting a capped exponential backoff with full jitter, or the Retry-After asked for by the server up to max_backoff.
+    Any other exception raised by an attempt is not retried but still counts as a failure for the circuit breaker.
+    One policy can be shared between endpoint instances by passing it to each of them as retry=,
+    in which case they also share its circuit breaker.
+
+    :param retries: Maximum number of retries after the first attempt
+    :param backoff: Seconds the first retry waits at most, doubled for every following retry
+    :param max_backoff: Cap on the seconds waited between two attempts
+    :param jitter: Wait a random time between 0 and the backoff instead of the full backoff
+    :param statuses: Status codes that are retried
+    :param methods: HTTP methods that are safe to retry
+    :param breaker: Circuit breaker consulted before every attempt.
+    A default one is created when not given, pass False to disable it.
+    """
+
+    def __init__(  # pylint: disable=R0913
+        self,
+        retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        jitter: bool = True,
+        statuses=(429, 502, 503, 504),
+        methods=("GET", "HEAD", "OPTIONS"),
+        breaker: CircuitBreaker = None,
+    ):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.statuses = frozenset(statuses)
+        self.methods = frozenset(method.upper() for method in methods)
+        self.breaker = CircuitBreaker() if breaker is None else breaker
+        self.counters = {}
+        self._lock = Lock()
+
+    def delay(self, attempt: int):
+        """Return the seconds to wait before the retry following attempt, the first attempt being 0."""
+        ceiling = min(self.max_backoff, self.backoff * 2**attempt)
+        return uniform(0, ceiling) if self.jitter else ceiling  # nosec B311
+
+    def stats(self):
+        """Return the requests, retries, failures and short circuits counted for every endpoint."""
+        with self._lock:
+            return {endpoint: dict(counter) for endpoint, counter in self.counters.items()}
+
+    def call(self, endpoint: str, method: str, send):
+        """
+        Send a request through the policy.
+
+        :param endpoint: Name the counters are kept under, usually the endpoint class name
+        :param method: HTTP method of the request, used to decide whether it may be retried
+        :param send: Callable sending the request and returning its response
+        """
+        retryable = method.upper() in self.methods
+        attempt = 0
+        while True:
+            if self.breaker and not self.breaker.allow():
+                self._count(endpoint, "short_circuits")
+                raise CircuitOpenError(f"Circuit open, not sending {method} request for {endpoint}")
+            self._count(endpoint, "requests")
+            try:
+                response = send()
+            except RETRYABLE_ERRORS:
+                self._record(False)
+                if not retryable or attempt >= self.retries:
+                    self._count(endpoint, "failures")
+                    raise
+                wait = self.delay(attempt)
+            except BaseException:
+                # Leaving a half-open circuit unresolved would keep it from ever allowing a request again
+                self._record(False)
+                self._count(endpoint, "failures")
+                raise
+            else:
+                self._record(response.status_code < 500)
+                if response.status_code not in self.statuses:
+                    return response
+                if not retryable or attempt >= self.retries:
+                    self._count(endpoint, "failures")
+                    return response
+                wait = retry_after(response)
+                wait = self.delay(attempt) if wait is None else min(wait, self.max_backoff)
+                response.close()
+            self._count(endpoint, "retries")
+            attempt += 1
+            sleep(wait)
+
+    def _record(self, success: bool):
+        """Report the outcome of an attempt to the circuit breaker."""
+        if self.breaker:
+            if success:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+
+    def _count(self, endpoint: str, event: str):
+        """Increment the counter of event for endpoint."""
+        with self._lock:
+            self.counters.setdefault(endpoint, Counter())[event] += 1
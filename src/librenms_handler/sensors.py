@@ -0,0 +1,175 @@
+"""Crawls the health and wireless sensors of every device concurrently into a catalog indexed by device and type."""
+import json
+import os
+from threading import Lock
+from time import time
+
+from librenms_handler.bulk import bulk
+from librenms_handler.files import atomic_write
+
+
+class SensorCatalog:
+    """
+    Health and wireless sensors of a fleet, indexed by device, then by graph type, then by sensor ID:
+    catalog.devices["sw1"]["device_temperature"]["12"] holds sensor 12 of sw1 as listed by the API,
+    its kind ("health" or "wireless") telling whether get_health_graph or get_wireless_graph draws it.
+    The time each device was last crawled is kept, so that stale devices can be crawled again on their own.
+
+    :param path: JSON file the catalog is loaded from if it exists, and written to by save()
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self.devices = {}
+        self.refreshed = {}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                data = json.load(file)
+            self.devices = data["devices"]
+            self.refreshed = data["refreshed"]
+        self._lock = Lock()
+
+    def update(self, device: str, types: dict):
+        """Replace the sensors of a device, given as a mapping of graph type to a mapping of sensor ID to sensor."""
+        with self._lock:
+            self.devices[device] = types
+            self.refreshed[device] = time()
+
+    def retain(self, devices):
+        """Forget every device not in devices, such as the ones deleted from LibreNMS, returning how many were."""
+        keep = {str(device) for device in devices}
+        with self._lock:
+            gone = [device for device in self.devices if device not in keep]
+            for device in gone:
+                del self.devices[device]
+                self.refreshed.pop(device, None)
+        return len(gone)
+
+    def stale(self, max_age: float):
+        """Return the devices last crawled more than max_age seconds ago."""
+        oldest = time() - max_age
+        with self._lock:
+            return [device for device, refreshed in self.refreshed.items() if refreshed < oldest]
+
+    def sensors(self, sensor_type: str = None, kind: str = None):
+        """
+        Yield a (device, graph type, sensor ID, sensor) tuple for every sensor of the catalog.
+
+        :param sensor_type: Only yield the sensors of this graph type, e.g. "device_temperature"
+        :param kind: Only yield the sensors of this kind, "health" or "wireless"
+        """
+        with self._lock:
+            devices = list(self.devices.items())
+        for device, types in devices:
+            for graph_type, sensors in types.items():
+                if sensor_type and graph_type != sensor_type:
+                    continue
+                for sensor_id, sensor in sensors.items():
+                    if not kind or sensor.get("kind") == kind:
+                        yield device, graph_type, sensor_id, sensor
+
+    def save(self, path: str = None):
+        """Write the catalog to path, or to the path it was loaded from, atomically, see atomic_write."""
+        path = path or self.path
+        with self._lock:
+            data = json.dumps({"devices": self.devices, "refreshed": self.refreshed}, sort_keys=True)
+        with atomic_write(path, "w", encoding="utf-8") as file:
+            file.write(data)
+
+
+def _graphs(devices, kind: str, device: str, graph_type: str = None, sensor_id: str = None):
+    """Return the graphs listed by list_available_health_graphs or list_available_wireless_graphs."""
+    method = devices.list_available_health_graphs if kind == "health" else devices.list_available_wireless_graphs
+    response = method(device, graph_type, sensor_id)
+    response.raise_for_status()
+    return response.json().get("graphs") or []
+
+
+def _sensor_id(graph: dict):
+    """
+    Return the ID of a graph listed for a type as a string.
+    Processors, storage and memory pools, listed as health graphs, are keyed by their own ID.
+    """
+    if "sensor_id" in graph:
+        return str(graph["sensor_id"])
+    return str(next((value for name, value in graph.items() if name.endswith("_id") and name != "device_id"), None))
+
+
+def _walk(devices, kind: str, device: str, details: bool):
+    """Walk the graph types of one kind of a device, then the sensors of each type, then each sensor if details."""
+    types = {}
+    for graph in _graphs(devices, kind, device):
+        sensors = types[graph["name"]] = {}
+        for sensor in _graphs(devices, kind, device, graph["name"]):
+            sensor_id = _sensor_id(sensor)
+            if details and "sensor_id" in sensor:
+                detail = _graphs(devices, kind, device, graph["name"], sensor_id)
+                sensor = (detail[0] if isinstance(detail, list) else detail) if detail else sensor
+            sensors[sensor_id] = dict(sensor, kind=kind)
+    return types
+
+
+def crawl_sensors(  # pylint: disable=R0913
+    devices,
+    catalog,
+    hostnames=None,
+    max_workers: int = 8,
+    wireless: bool = True,
+    sensor_list: bool = True,
+    details: bool = False,
+):
+    """
+    Crawl the sensors of many devices concurrently into a catalog, yielding a BulkResult per device as it completes,
+    whose result is the number of sensors found. A device that could not be crawled keeps its previous sensors.
+    Without hostnames every device is crawled, and the devices no longer listed are dropped once all are done.
+    The catalog is saved once every device has been crawled, or the iteration stopped, if it has a path.
+
+    :param devices: Devices endpoint to crawl with
+    :param catalog: SensorCatalog, or the path of one
+    :param hostnames: Devices to crawl, to refresh part of the catalog, every device listed by list_devices if not given
+    :param max_workers: Maximum number of devices crawled at once
+    :param wireless: Whether to crawl the wireless sensors, walked per device as they have no list of their own
+    :param sensor_list: Find the health sensors of every device with one list_sensors call instead of walking
+    list_available_health_graphs per device. The health graphs that are not sensors, processors, storage and memory
+    pools, are then left out.
+    :param details: Fetch every walked sensor on its own, for its full record instead of its ID and description.
+    The health sensors found through list_sensors are full records already.
+    """
+    if isinstance(catalog, str):
+        catalog = SensorCatalog(catalog)
+    crawl_all = hostnames is None
+    ids = {}
+    if crawl_all or sensor_list:
+        listed = []
+        for device in devices.iter_devices():
+            ids[device["hostname"]] = ids[str(device["device_id"])] = device["device_id"]
+            listed.append(device["hostname"])
+        if crawl_all:
+            hostnames = listed
+    health = {}
+    if sensor_list:
+        for sensor in devices.iter_sensors():
+            types = health.setdefault(str(sensor["device_id"]), {})
+            types.setdefault(f"device_{sensor['sensor_class']}", {})[str(sensor["sensor_id"])] = dict(
+                sensor, kind="health"
+            )
+
+    def crawl(device):
+        if sensor_list:
+            if str(device) not in ids:
+                raise LookupError(f"{device} is not listed by list_devices")
+            types = dict(health.get(str(ids[str(device)]), {}))
+        else:
+            types = _walk(devices, "health", device, details)
+        if wireless:
+            types.update(_walk(devices, "wireless", device, details))
+        catalog.update(str(device), types)
+        return sum(len(sensors) for sensors in types.values())
+
+    try:
+        yield from bulk(crawl, hostnames, max_workers)
+        if crawl_all:
+            catalog.retain(hostnames)
+    finally:
+        if catalog.path:
+            catalog.save()
@@ -0,0 +1,116 @@
+"""Decodes the records of large list responses incrementally, without holding the whole body in memory."""
+from codecs import getincrementaldecoder
+from json import JSONDecodeError, JSONDecoder
+from json.decoder import WHITESPACE, scanstring
+
+# Characters that can follow a complete value, a number cut short by the end of the buffer being followed by none
+_DELIMITERS = frozenset(" \t\n\r,]}")
+
+
+class _Buffer:
+    """Text read so far from a response body, dropping what has already been decoded."""
+
+    def __init__(self, response, chunk_size: int):
+        self.chunks = response.iter_content(chunk_size)
+        self.decoder = getincrementaldecoder(response.encoding or "utf-8")()
+        self.chunk_size = chunk_size
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def more(self):
+        """
+        Read at least chunk_size more bytes of the body, returning False once it is exhausted.
+        Chunked transfer encoding can hand over many tiny chunks, which are joined so the buffer is extended once.
+        """
+        if self.eof:
+            return False
+        chunks, size = [], 0
+        while size < self.chunk_size:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                self.eof = True
+                break
+            chunks.append(chunk)
+            size += len(chunk)
+        self.text = self.text[self.pos :] + self.decoder.decode(b"".join(chunks), final=self.eof)
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Skip whitespace and return the next character, or an empty string at the end of the body."""
+        while True:
+            self.pos = WHITESPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text) or not self.more():
+                return self.text[self.pos : self.pos + 1]
+
+    def expect(self, character: str):
+        """Consume character, raising a JSONDecodeError if the body has something else next."""
+        if self.peek() != character:
+            raise JSONDecodeError(f"Expecting '{character}'", self.text, self.pos)
+        self.pos += 1
+
+    def decode(self, parse):
+        """
+        Run parse(text, pos) -> (value, end) on the buffer, reading more of the body until it succeeds.
+        A number is only complete once a delimiter follows it, as -0. or 1e+ parse as the shorter -0 or 1.
+        """
+        while True:
+            try:
+                value, end = parse(self.text, self.pos)
+            except JSONDecodeError:
+                if not self.more():
+                    raise
+                continue
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                complete = end < len(self.text) and self.text[end] in _DELIMITERS
+            else:
+                complete = end < len(self.text) or isinstance(value, (dict, list, str))
+            if complete or self.eof:
+                self.pos = end
+                return value
+            self.more()
+
+
+def iter_json_array(response, key: str = None, chunk_size: int = 65536):
+    """
+    Yield the records of an array in a JSON response one at a time, reading the body in chunks.
+    Only one record and one chunk are held in memory at any point.
+    The response should be requested with stream=True and is closed once the array has been read.
+
+    :param response: Response whose body is a JSON object holding the array, or the array itself
+    :param key: Top-level key of the array (e.g. "devices", "ports_fdb", "links"), None if the body is the array.
+    A key whose value is null yields nothing, the same as an empty array.
+    :param chunk_size: Number of bytes read from the body at a time
+    """
+    raw_decode = JSONDecoder().raw_decode
+    try:
+        response.raise_for_status()
+        buffer = _Buffer(response, chunk_size)
+        if key is not None:
+            buffer.expect("{")
+            while True:
+                if buffer.peek() in ("}", ""):
+                    return
+                if buffer.peek() == ",":
+                    buffer.pos += 1
+                buffer.expect('"')
+                name = buffer.decode(scanstring)
+                buffer.expect(":")
+                if name == key:
+                    break
+                buffer.peek()
+                buffer.decode(raw_decode)
+            if buffer.peek() == "n" and buffer.decode(raw_decode) is None:
+                return
+        buffer.expect("[")
+        while True:
+            character = buffer.peek()
+            if character in ("]", ""):
+                return
+            if character == ",":
+                buffer.pos += 1
+                continue
+            yield buffer.decode(raw_decode)
+    finally:
+        response.close()
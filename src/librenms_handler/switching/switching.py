@@ -1,22 +1,25 @@
 """Includes all the methods available to the Devices endpoint."""
-from requests import get
-
 from librenms_handler import LibreNMS
+from librenms_handler.cache import cached
+from librenms_handler.models import FdbEntry, Link
+from librenms_handler.streaming import iter_json_array
+from librenms_handler.topology import Topology
 
 
 class Switching(LibreNMS):
     """Includes all the methods available to the Switching endpoint."""
 
-    def __init__(self, url=None, token=None, verify=True):
-        super().__init__(url, token, verify)
+    def __init__(self, url=None, token=None, verify=True, **kwargs):
+        super().__init__(url, token, verify, **kwargs)
         self.base_url = self.url
         self.url = f"{self.url}/api/v0/resources"
 
+    @cached("vlans")
     def list_vlans(self):
         """
         Get a list of all VLANs.
         """
-        return get(f"{self.url}/vlans", headers=self.headers, verify=self.verify)
+        return self._get(f"{self.url}/vlans", headers=self.headers, verify=self.verify)
 
     def get_vlans(self, device: str):
         """
@@ -24,17 +27,59 @@ class Switching(LibreNMS):
 
         :param device: Can be either the device hostname or ID
         """
-        return get(
+        return self._get(
             f"{self.base_url}/api/v0/devices/{device}/vlans",
             headers=self.headers,
             verify=self.verify,
         )
 
-    def list_links(self):
+    def list_links(self, stream: bool = False):
         """
         Get a list of all Links.
+
+        :param stream: Leave the body unread so it can be decoded incrementally, see iter_links.
+        """
+        return self._get(f"{self.url}/links", headers=self.headers, verify=self.verify, stream=stream)
+
+    def iter_links(self):
+        """
+        Iterate over all Links one at a time, decoding the response as it is read.
+        """
+        return iter_json_array(self.list_links(stream=True), "links")
+
+    def link_records(self):
+        """
+        Iterate over all Links as compact Link records, decoding the response as it is read.
+        """
+        return Link.from_items(self.iter_links())
+
+    def build_topology(self):
+        """
+        Build an in-memory Topology of every link, decoding the response as it is read.
+        """
+        return Topology.from_links(self.iter_links())
+
+    def refresh_topology(self, topology: Topology, device: str):
         """
-        return get(f"{self.url}/links", headers=self.headers, verify=self.verify)
+        Replace the links of one device in a Topology with the ones it currently reports.
+        The topology is keyed by device ID, which is taken from the links returned,
+        or looked up with the device itself when a hostname no longer reports any link.
+
+        :param topology: Topology built by build_topology
+        :param device: ID or hostname of the device
+        """
+        response = self.get_links(device)
+        response.raise_for_status()
+        links = response.json().get("links") or []
+        if links:
+            device_id = links[0]["local_device_id"]
+        elif str(device).isdigit():
+            device_id = int(device)
+        else:
+            response = self._get(f"{self.base_url}/api/v0/devices/{device}", headers=self.headers, verify=self.verify)
+            response.raise_for_status()
+            device_id = response.json()["devices"][0]["device_id"]
+        topology.update_device(device_id, links)
 
     def get_links(self, device: str):
         """
@@ -42,7 +87,7 @@ class Switching(LibreNMS):
 
         :param device: Can be either the device hostname or ID
         """
-        return get(
+        return self._get(
             f"{self.base_url}/api/v0/devices/{device}/links",
             headers=self.headers,
             verify=self.verify,
@@ -54,7 +99,7 @@ class Switching(LibreNMS):
 
         :param link: Should be a link ID (integer)
         """
-        return get(f"{self.url}/links/{link}", headers=self.headers, verify=self.verify)
+        return self._get(f"{self.url}/links/{link}", headers=self.headers, verify=self.verify)
 
     def list_fdb(self, mac: str = None):
         """
@@ -65,15 +110,32 @@ class Switching(LibreNMS):
         if not mac:
             mac = ''
 
-        return get(f"{self.url}/fdb/{mac}", headers=self.headers, verify=self.verify)
+        return self._get(f"{self.url}/fdb/{mac}", headers=self.headers, verify=self.verify)
 
-    def list_fdb_detail(self, mac: str = None):
+    def list_fdb_detail(self, mac: str = None, stream: bool = False):
         """
         Get a detailed list of all ports FDB
 
         :param mac: is the specific MAC address you would like to query
+        :param stream: Leave the body unread so it can be decoded incrementally, see iter_fdb_detail.
         """
         if not mac:
             mac = ''
 
-        return get(f"{self.url}/fdb/{mac}/detail", headers=self.headers, verify=self.verify)
+        return self._get(f"{self.url}/fdb/{mac}/detail", headers=self.headers, verify=self.verify, stream=stream)
+
+    def iter_fdb_detail(self, mac: str = None):
+        """
+        Iterate over the detailed ports FDB one entry at a time, decoding the response as it is read.
+
+        :param mac: is the specific MAC address you would like to query
+        """
+        return iter_json_array(self.list_fdb_detail(mac, stream=True), "ports_fdb")
+
+    def fdb_records(self, mac: str = None):
+        """
+        Iterate over the detailed ports FDB as compact FdbEntry records, decoding the response as it is read.
+
+        :param mac: is the specific MAC address you would like to query
+        """
+        return FdbEntry.from_items(self.iter_fdb_detail(mac))
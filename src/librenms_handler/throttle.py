@@ -0,0 +1,124 @@
+"""Client-side limits on how fast and how many requests are sent to one LibreNMS instance."""
+from threading import Condition, Lock
+from time import monotonic, sleep
+
+
+class TokenBucket:
+    """
+    Limits the average request rate while allowing short bursts.
+
+    :param rate: Requests allowed per second on average
+    :param burst: Requests that may be sent back to back after an idle period, defaults to rate
+    """
+
+    def __init__(self, rate: float, burst: float = None):
+        self.rate = rate
+        self.burst = burst or max(rate, 1)
+        self._tokens = self.burst
+        self._updated = monotonic()
+        self._lock = Lock()
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        while True:
+            with self._lock:
+                now = monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            sleep(wait)
+
+
+class AdaptiveLimiter:  # pylint: disable=R0902
+    """
+    Limits the number of requests in flight, adjusting the limit with additive increase and multiplicative decrease.
+    The limit grows by one for every limit requests that succeed within latency_target,
+    and is multiplied by backoff when a request is slower than that or fails, at most once per latency_target.
+
+    :param initial: Requests allowed in flight at first
+    :param minimum: Lowest the limit may drop to
+    :param maximum: Highest the limit may grow to
+    :param latency_target: Seconds above which a request is treated as a sign of overload
+    :param backoff: Factor the limit is multiplied by on overload
+    """
+
+    def __init__(  # pylint: disable=R0913
+        self,
+        initial: int = 8,
+        minimum: int = 1,
+        maximum: int = 64,
+        latency_target: float = 1.0,
+        backoff: float = 0.5,
+    ):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.limit = float(initial)
+        self.in_flight = 0
+        self._decreased = 0.0
+        self._condition = Condition()
+
+    def acquire(self):
+        """Block until fewer requests than the current limit are in flight."""
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self, latency: float, failed: bool = False):
+        """
+        Report a finished request and adjust the limit.
+
+        :param latency: Seconds the request took
+        :param failed: Whether the request errored or the server reported being overloaded
+        """
+        with self._condition:
+            self.in_flight -= 1
+            now = monotonic()
+            if failed or latency > self.latency_target:
+                if now - self._decreased > self.latency_target:
+                    self.limit = max(self.minimum, self.limit * self.backoff)
+                    self._decreased = now
+            else:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+
+class Throttle:
+    """
+    Combines a rate limit and an adaptive concurrency limit for one LibreNMS instance.
+    Pass the same throttle to every endpoint instance talking to that LibreNMS so that they share its limits.
+
+    :param rate: Requests per second allowed on average, None for no rate limit
+    :param burst: Requests that may be sent back to back after an idle period
+    :param concurrency: AdaptiveLimiter bounding the requests in flight, None for no concurrency limit
+    """
+
+    def __init__(self, rate: float = None, burst: float = None, concurrency: AdaptiveLimiter = None):
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.concurrency = concurrency
+
+    def call(self, send):
+        """
+        Send a request once the limits allow it.
+
+        :param send: Callable sending the request and returning its response
+        """
+        if self.bucket:
+            self.bucket.acquire()
+        if not self.concurrency:
+            return send()
+        self.concurrency.acquire()
+        started = monotonic()
+        # The slot is released whatever send() raises, KeyboardInterrupt included, counting it as a failure
+        failed = True
+        try:
+            response = send()
+            failed = response.status_code == 429 or response.status_code >= 500
+        finally:
+            self.concurrency.release(monotonic() - started, failed)
+        return response
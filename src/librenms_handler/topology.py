@@ -0,0 +1,133 @@
+"""In-memory adjacency index of the LLDP/CDP links discovered by LibreNMS."""
+from collections import Counter, deque
+
+
+def link_ends(link: dict):
+    """
+    Return the two nodes a link connects.
+    Devices are identified by their device ID, or by the remote hostname when the neighbour is not monitored.
+    """
+    return link["local_device_id"], link.get("remote_device_id") or link.get("remote_hostname")
+
+
+class Topology:
+    """
+    Undirected graph of devices built from Switching.list_links in one pass.
+    Parallel links between two devices (both ends reporting, port channels) are counted,
+    so removing one of them keeps the devices adjacent.
+
+    :param adjacency: Mapping of node to a Counter of its neighbours and the number of links to each
+    :param links: Mapping of link ID to the two nodes it connects
+    """
+
+    def __init__(self):
+        self.adjacency = {}
+        self.links = {}
+        self._reported = {}
+
+    @classmethod
+    def from_links(cls, links):
+        """Build the graph from an iterable of links, such as Switching.iter_links()."""
+        topology = cls()
+        for link in links:
+            topology.add_link(link)
+        return topology
+
+    def add_link(self, link: dict):
+        """Add a link as returned by list_links or get_links, replacing any link with the same ID."""
+        if link["id"] in self.links:
+            self.remove_link(link["id"])
+        local, remote = link_ends(link)
+        if remote is None or local == remote:
+            return
+        self.links[link["id"]] = (local, remote)
+        self._reported.setdefault(local, set()).add(link["id"])
+        self.adjacency.setdefault(local, Counter())[remote] += 1
+        self.adjacency.setdefault(remote, Counter())[local] += 1
+
+    def remove_link(self, link_id):
+        """Remove a link by its ID, dropping devices left without any link."""
+        local, remote = self.links.pop(link_id)
+        self._reported[local].discard(link_id)
+        for node, neighbour in ((local, remote), (remote, local)):
+            neighbours = self.adjacency[node]
+            neighbours[neighbour] -= 1
+            if neighbours[neighbour] <= 0:
+                del neighbours[neighbour]
+            if not neighbours:
+                del self.adjacency[node]
+
+    def update_device(self, device_id, links):
+        """
+        Replace the links reported by one device, such as after Switching.get_links(device) changed.
+
+        :param device_id: ID of the device the links are local to
+        :param links: Every link currently reported by that device
+        """
+        for link_id in list(self._reported.get(device_id, ())):
+            self.remove_link(link_id)
+        for link in links:
+            self.add_link(link)
+
+    def neighbours(self, node):
+        """Return the set of nodes directly linked to node."""
+        return set(self.adjacency.get(node, ()))
+
+    def shortest_path(self, source, target):
+        """Return the list of nodes on a shortest path from source to target, or None if they are not connected."""
+        if source not in self.adjacency or target not in self.adjacency:
+            return None
+        previous = {source: None}
+        queue = deque([source])
+        while queue:
+            node = queue.popleft()
+            if node == target:
+                path = []
+                while node is not None:
+                    path.append(node)
+                    node = previous[node]
+                return path[::-1]
+            for neighbour in self.adjacency[node]:
+                if neighbour not in previous:
+                    previous[neighbour] = node
+                    queue.append(neighbour)
+        return None
+
+    def reachable(self, source, exclude=None):
+        """Return the set of nodes connected to source, walking around the exclude node if given."""
+        seen = {source}
+        queue = deque([source])
+        while queue:
+            for neighbour in self.adjacency.get(queue.popleft(), ()):
+                if neighbour not in seen and neighbour != exclude:
+                    seen.add(neighbour)
+                    queue.append(neighbour)
+        return seen
+
+    def components(self):
+        """Return the connected components of the graph as a list of sets of nodes, largest first."""
+        seen = set()
+        components = []
+        for node in self.adjacency:
+            if node not in seen:
+                component = self.reachable(node)
+                seen |= component
+                components.append(component)
+        return sorted(components, key=len, reverse=True)
+
+    def downstream(self, node, root):
+        """
+        Return the nodes that lose their connection to root when node goes down, i.e. its blast radius.
+
+        :param node: Node that fails
+        :param root: Node the rest of the network is reached from, such as the core router
+        """
+        if node == root:
+            return self.reachable(root) - {root}
+        return self.reachable(node) - self.reachable(root, exclude=node) - {node}
+
+    def __len__(self):
+        return len(self.adjacency)
+
+    def __contains__(self, node):
+        return node in self.adjacency
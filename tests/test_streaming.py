@@ -0,0 +1,74 @@
+"""Tests of the incremental decoding of list responses."""
+import json
+import random
+import unittest
+
+from librenms_handler.streaming import iter_json_array
+
+
+class FakeResponse:
+    """Stands in for a streamed requests.Response, handing over its body in the given chunks."""
+
+    encoding = "utf-8"
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.closed = False
+
+    def raise_for_status(self):
+        """The body is always a successful one."""
+
+    def iter_content(self, _chunk_size):
+        """Yield the chunks of the body."""
+        return iter(self.chunks)
+
+    def close(self):
+        """Record that the response was closed."""
+        self.closed = True
+
+
+def split(body: bytes, rng: random.Random, largest: int):
+    """Cut body into chunks of 1 to largest bytes."""
+    chunks, start = [], 0
+    while start < len(body):
+        size = rng.randint(1, largest)
+        chunks.append(body[start : start + size])
+        start += size
+    return chunks
+
+
+BODIES = [
+    {"status": "ok", "devices": [None, -0.5, 1e5, -12, 3.25e-7, 1e400, True, False, 0, "é/\\"], "count": 10},
+    {"status": "ok", "count": 2, "extra": {"a": [1.5, -2e+3]}, "devices": [{"device_id": 1, "uptime": 10.75}, []]},
+    {"status": "ok", "devices": []},
+    {"status": "ok", "devices": None},
+    {"status": "ok"},
+]
+
+
+class IterJsonArrayTest(unittest.TestCase):
+    """iter_json_array yields the same records as json.loads, however the body is chunked."""
+
+    def test_random_chunks(self):
+        """Bodies cut into random chunks, splitting numbers, strings and literals anywhere."""
+        rng = random.Random(0)
+        for document in BODIES:
+            body = json.dumps(document, ensure_ascii=False).encode()
+            expected = json.loads(body).get("devices") or []
+            for largest in (1, 2, 3, 5, 16, len(body)):
+                for chunk_size in (1, 4, 1024):
+                    with self.subTest(body=body, largest=largest, chunk_size=chunk_size):
+                        response = FakeResponse(split(body, rng, largest))
+                        self.assertEqual(list(iter_json_array(response, "devices", chunk_size)), expected)
+                        self.assertTrue(response.closed)
+
+    def test_bare_array(self):
+        """A body that is the array itself, without a key."""
+        body = b"[1, -0.5, 2e-3, null]"
+        for size in (1, 2, 3):
+            chunks = [body[start : start + size] for start in range(0, len(body), size)]
+            self.assertEqual(list(iter_json_array(FakeResponse(chunks), chunk_size=1)), [1, -0.5, 2e-3, None])
+
+
+if __name__ == "__main__":
+    unittest.main()